@@ -1,12 +1,75 @@
+import io
+import queue
+from contextlib import contextmanager
+
 import cv2
 import numpy as np
 from PIL import Image
 import mediapipe as mp
 from logger import logger
+from analyzer.image_devide import get_face_part_boxes
+from utils.face_utils import get_face_roi
 
 mp_face_mesh = mp.solutions.face_mesh
 
-def detect_landmarks(image_bytes: bytes):
+# 프로세스 안에서 재사용하는 FaceMesh 인스턴스들 (그래프 초기화는 인스턴스당 한 번)
+# 동시에 쓰는 스레드 수만큼만 만들어지며, 프로세스 풀 워커에서는 하나만 사용됩니다.
+_face_mesh_pool: "queue.LifoQueue" = queue.LifoQueue()
+
+def _create_face_mesh():
+    logger.debug("FaceMesh 그래프 초기화")
+    return mp_face_mesh.FaceMesh(
+        static_image_mode=True,           # 정적 이미지 처리
+        max_num_faces=1,                  # 최대 얼굴 수: 1
+        refine_landmarks=True,            # 눈, 입술 등 세부 랜드마크 보정
+        min_detection_confidence=0.5      # 감지 신뢰도 임계값
+    )
+
+@contextmanager
+def face_mesh_session():
+    """재사용 FaceMesh 를 하나 빌려 쓰고 반납합니다 (없으면 새로 생성)."""
+    try:
+        face_mesh = _face_mesh_pool.get_nowait()
+    except queue.Empty:
+        face_mesh = _create_face_mesh()
+    try:
+        yield face_mesh
+    finally:
+        _face_mesh_pool.put(face_mesh)
+
+def _get_alignment_matrix(face_landmarks, w: int, h: int) -> np.ndarray:
+    # 눈 좌표 추출 (좌: 33, 우: 263)
+    left_eye = face_landmarks.landmark[33]
+    right_eye = face_landmarks.landmark[263]
+
+    left_eye_pos = np.array([left_eye.x * w, left_eye.y * h])
+    right_eye_pos = np.array([right_eye.x * w, right_eye.y * h])
+
+    # 회전 각도 계산 (눈 중심을 수평으로 정렬)
+    delta = right_eye_pos - left_eye_pos
+    angle = np.degrees(np.arctan2(delta[1], delta[0]))
+
+    logger.debug(f"얼굴 회전 각도: {angle:.2f}도")
+
+    # 프레임 중심 기준 회전 행렬
+    center = (int(w // 2), int(h // 2))
+    return cv2.getRotationMatrix2D(center, angle, 1.0)
+
+def get_proxy_scale(image_bytes: bytes, max_side: int | None = None) -> float:
+    """
+    _decode_image 가 max_side 프록시 해상도로 줄일 때의 배율 (원본 좌표 = 프록시 좌표 / 배율).
+    긴 변만 사용하므로 EXIF 회전과 무관하며, 이미지 헤더만 읽습니다.
+    """
+    if not max_side:
+        return 1.0
+    try:
+        with Image.open(io.BytesIO(image_bytes)) as header:
+            long_side = max(header.size)
+    except Exception:
+        long_side = max(_decode_image(image_bytes)[0].shape[:2])
+    return min(max_side / long_side, 1.0)
+
+def _decode_image(image_bytes: bytes, max_side: int | None = None) -> tuple[np.ndarray, float]:
     # 이미지 바이트 → OpenCV 이미지
     logger.debug("이미지 바이트 수신 및 디코딩 시도")
     image_array = np.frombuffer(image_bytes, np.uint8)
@@ -18,16 +81,34 @@ def detect_landmarks(image_bytes: bytes):
 
     logger.debug("OpenCV 이미지 디코딩 성공")
 
+    # 프록시 해상도: 긴 변이 max_side 를 넘으면 축소
+    h, w = image_bgr.shape[:2]
+    scale = 1.0
+    if max_side and max(h, w) > max_side:
+        scale = max_side / max(h, w)
+        image_bgr = cv2.resize(image_bgr, (max(int(w * scale), 1), max(int(h * scale), 1)),
+                               interpolation=cv2.INTER_AREA)
+        logger.debug(f"프록시 해상도로 축소: {w}x{h} → {image_bgr.shape[1]}x{image_bgr.shape[0]}")
+
     # BGR → RGB 변환
-    image_rgb = cv2.cvtColor(image_bgr, cv2.COLOR_BGR2RGB)
+    return cv2.cvtColor(image_bgr, cv2.COLOR_BGR2RGB), scale
 
-    # MediaPipe 모델 초기화
-    with mp_face_mesh.FaceMesh(
-        static_image_mode=True,           # 정적 이미지 처리
-        max_num_faces=1,                  # 최대 얼굴 수: 1
-        refine_landmarks=True,            # 눈, 입술 등 세부 랜드마크 보정
-        min_detection_confidence=0.5      # 감지 신뢰도 임계값
-    ) as face_mesh:
+def _to_pixels(points, subpixel: bool = False) -> list:
+    # 프록시 해상도에서는 정수 절삭 오차가 원본 기준 1/배율 픽셀로 커지므로 소수 좌표 유지
+    if subpixel:
+        return [(float(x), float(y)) for x, y in points]
+    return [(int(x), int(y)) for x, y in points]
+
+def _rotate_landmarks(face_landmarks, rot_mat: np.ndarray, w: int, h: int) -> np.ndarray:
+    # 정규화 랜드마크 → 픽셀 좌표 → 회전 좌표계
+    points = np.array([(lm.x * w, lm.y * h) for lm in face_landmarks.landmark])
+    return points @ rot_mat[:, :2].T + rot_mat[:, 2]
+
+def detect_landmarks(image_bytes: bytes, max_side: int | None = None):
+    image_rgb, _ = _decode_image(image_bytes, max_side)
+
+    # MediaPipe 모델 (프로세스 안에서 재사용)
+    with face_mesh_session() as face_mesh:
 
         results = face_mesh.process(image_rgb)
 
@@ -52,25 +133,13 @@ def detect_landmarks(image_bytes: bytes):
         return landmarks, image_pil
 
 
-def align_and_detect_landmarks(image_bytes: bytes):
-    # 이미지 바이트 → OpenCV 이미지
-    logger.debug("이미지 바이트 수신 및 디코딩 시도")
-    image_array = np.frombuffer(image_bytes, np.uint8)
-    image_bgr = cv2.imdecode(image_array, cv2.IMREAD_COLOR)
+# second_pass=False 이면 회전 이미지 재검출 대신 1차 랜드마크를 회전해 사용 (고부하 시 저비용 단계용)
+# max_side 로 축소된 경우 랜드마크는 소수 좌표 (원본 좌표 = 좌표 / get_proxy_scale())
+def align_and_detect_landmarks(image_bytes: bytes, max_side: int | None = None, second_pass: bool = True):
+    image_rgb, scale = _decode_image(image_bytes, max_side)
+    subpixel = scale < 1.0
 
-    if image_bgr is None:
-        logger.error("이미지 디코딩 실패: 유효하지 않은 이미지")
-        raise ValueError("Invalid image data")
-
-    logger.debug("OpenCV 이미지 디코딩 성공")
-    image_rgb = cv2.cvtColor(image_bgr, cv2.COLOR_BGR2RGB)
-
-    with mp_face_mesh.FaceMesh(
-        static_image_mode=True,
-        max_num_faces=1,
-        refine_landmarks=True,
-        min_detection_confidence=0.5
-    ) as face_mesh:
+    with face_mesh_session() as face_mesh:
 
         results = face_mesh.process(image_rgb)
 
@@ -82,24 +151,14 @@ def align_and_detect_landmarks(image_bytes: bytes):
         face_landmarks = results.multi_face_landmarks[0]
         h, w, _ = image_rgb.shape
 
-        # 눈 좌표 추출 (좌: 33, 우: 263)
-        left_eye = face_landmarks.landmark[33]
-        right_eye = face_landmarks.landmark[263]
-
-        left_eye_pos = np.array([left_eye.x * w, left_eye.y * h])
-        right_eye_pos = np.array([right_eye.x * w, right_eye.y * h])
-
-        # 회전 각도 계산 (눈 중심을 수평으로 정렬)
-        delta = right_eye_pos - left_eye_pos
-        angle = np.degrees(np.arctan2(delta[1], delta[0]))
-
-        logger.debug(f"얼굴 회전 각도: {angle:.2f}도")
-
-        # 회전 행렬 계산 및 이미지 회전
-        center = (int(w // 2), int(h // 2))
-        rot_mat = cv2.getRotationMatrix2D(center, angle, 1.0)
+        # 눈 좌표 기준 회전 행렬 계산 및 이미지 회전
+        rot_mat = _get_alignment_matrix(face_landmarks, w, h)
         aligned_image = cv2.warpAffine(image_rgb, rot_mat, (w, h), flags=cv2.INTER_LINEAR)
 
+        if not second_pass:
+            aligned_landmarks = _to_pixels(_rotate_landmarks(face_landmarks, rot_mat, w, h), subpixel)
+            return aligned_landmarks, Image.fromarray(aligned_image)
+
         # 회전된 이미지로 다시 랜드마크 감지
         results_aligned = face_mesh.process(aligned_image)
 
@@ -107,11 +166,68 @@ def align_and_detect_landmarks(image_bytes: bytes):
             logger.warning("얼굴이 회전된 이미지에서도 감지되지 않음")
             return None, None
 
-        aligned_landmarks = []
-        for lm in results_aligned.multi_face_landmarks[0].landmark:
-            x, y = int(lm.x * w), int(lm.y * h)
-            aligned_landmarks.append((x, y))
+        aligned_landmarks = _to_pixels(
+            ((lm.x * w, lm.y * h) for lm in results_aligned.multi_face_landmarks[0].landmark), subpixel)
 
         aligned_pil_image = Image.fromarray(aligned_image)
 
-        return aligned_landmarks, aligned_pil_image
\ No newline at end of file
+        return aligned_landmarks, aligned_pil_image
+
+
+def align_and_detect_landmarks_roi(image_bytes: bytes, max_side: int | None = None, second_pass: bool = True):
+    """
+    align_and_detect_landmarks 의 얼굴 ROI 버전.
+    회전·재검출을 전체 프레임이 아닌 패딩된 얼굴 영역에서만 수행하므로
+    큰 사진 속 작은 얼굴일수록 비용이 줄어듭니다.
+
+    Returns:
+        (ROI 좌표계 랜드마크, ROI 크기의 정렬된 PIL 이미지, FaceROI)
+        얼굴이 감지되지 않으면 (None, None, None)
+    """
+    image_rgb, scale = _decode_image(image_bytes, max_side)
+    subpixel = scale < 1.0
+
+    with face_mesh_session() as face_mesh:
+
+        results = face_mesh.process(image_rgb)
+
+        if not results.multi_face_landmarks:
+            logger.warning("얼굴이 감지되지 않음")
+            return None, None, None
+
+        logger.debug("얼굴 랜드마크 감지 성공")
+        face_landmarks = results.multi_face_landmarks[0]
+        h, w, _ = image_rgb.shape
+        rot_mat = _get_alignment_matrix(face_landmarks, w, h)
+
+        # 1차 랜드마크를 회전 좌표계로 옮겨 얼굴 ROI 계산
+        # 부위 크롭 패딩은 프레임 크기 비율이므로 해당 크롭 박스가 ROI 안에 들어가도록 포함
+        rotated_points = _rotate_landmarks(face_landmarks, rot_mat, w, h).tolist()
+        part_boxes = get_face_part_boxes(rotated_points, (w, h))
+        roi = get_face_roi(rotated_points, (w, h), boxes=part_boxes.values())
+        roi_w, roi_h = roi.size
+        logger.debug(f"얼굴 ROI: {roi} (프레임 대비 면적 {roi_w * roi_h / (w * h):.1%})")
+
+        # ROI 만큼 평행이동한 회전 행렬로 얼굴 영역만 회전
+        roi_mat = rot_mat.copy()
+        roi_mat[0, 2] -= roi.left
+        roi_mat[1, 2] -= roi.top
+        aligned_roi = cv2.warpAffine(image_rgb, roi_mat, (roi_w, roi_h), flags=cv2.INTER_LINEAR)
+
+        if not second_pass:
+            aligned_landmarks = _to_pixels(((x - roi.left, y - roi.top) for x, y in rotated_points), subpixel)
+            return aligned_landmarks, Image.fromarray(aligned_roi), roi
+
+        # 회전된 ROI에서 다시 랜드마크 감지
+        results_aligned = face_mesh.process(aligned_roi)
+
+        if not results_aligned.multi_face_landmarks:
+            logger.warning("얼굴이 회전된 ROI에서도 감지되지 않음")
+            return None, None, None
+
+        aligned_landmarks = _to_pixels(
+            ((lm.x * roi_w, lm.y * roi_h) for lm in results_aligned.multi_face_landmarks[0].landmark), subpixel)
+
+        aligned_pil_image = Image.fromarray(aligned_roi)
+
+        return aligned_landmarks, aligned_pil_image, roi
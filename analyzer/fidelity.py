@@ -0,0 +1,99 @@
+# analyzer/fidelity.py
+#
+# 부하 적응형 분석 품질 단계(fidelity tier).
+# 피크 트래픽에서 타임아웃 대신 조금 저렴한 분석을 응답하도록,
+# 현재 처리 중인 요청 수(큐 깊이)와 최근 지연 시간으로 단계를 자동 선택합니다.
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import NamedTuple
+
+from logger import logger
+
+class FidelityTier(NamedTuple):
+    name: str
+    second_pass: bool                  # 회전 이미지에서 FaceMesh 재검출 여부
+    max_side: int | None               # 분석용 프록시 해상도 (긴 변, None = 원본)
+    render_size: tuple[int, int]       # 결과 이미지 크기
+    images: bool                       # 부위/결과 이미지 포함 여부
+
+# 0 → 3 으로 갈수록 저렴한 단계
+TIERS = [
+    FidelityTier("full", True, None, (800, 1000), True),
+    FidelityTier("single_pass", False, None, (800, 1000), True),
+    FidelityTier("proxy", False, 1024, (400, 500), True),
+    FidelityTier("scores_only", False, 1024, (400, 500), False),
+]
+
+# 처리 중인 /analyze 요청 수가 각 값 이상이면 단계 1, 2, 3 (빈 값이면 사용 안 함)
+FIDELITY_QUEUE_THRESHOLDS = [
+    int(v) for v in os.getenv("FIDELITY_QUEUE_THRESHOLDS", "8,16,32").split(",") if v.strip()
+]
+
+# 최근 지연 시간(EWMA)이 예산의 1배, 2배, 3배를 넘으면 단계 1, 2, 3 (0 이면 사용 안 함)
+LATENCY_BUDGET_MS = float(os.getenv("LATENCY_BUDGET_MS", "0"))
+
+# 지연 시간 EWMA 가중치
+LATENCY_EWMA_ALPHA = 0.2
+
+class TierSelector:
+    """
+    요청 시작 시 단계를 고르고, 단계별 선택 횟수와 지연 시간을 집계합니다.
+
+    사용 예:
+        selector = TierSelector()
+        with selector.track() as tier:
+            body, status = analyze_image(image_bytes, tier)
+    """
+
+    def __init__(self, queue_thresholds=None, latency_budget_ms=None):
+        self.queue_thresholds = FIDELITY_QUEUE_THRESHOLDS if queue_thresholds is None else list(queue_thresholds)
+        self.latency_budget_ms = LATENCY_BUDGET_MS if latency_budget_ms is None else latency_budget_ms
+        self.in_flight = 0
+        self.latency_ewma_ms = 0.0
+        self.tier_counts = {tier.name: 0 for tier in TIERS}
+        self._lock = threading.Lock()
+
+    def _pick(self) -> int:
+        by_queue = sum(1 for threshold in self.queue_thresholds if self.in_flight >= threshold)
+        by_latency = 0
+        if self.latency_budget_ms > 0:
+            by_latency = int(self.latency_ewma_ms // self.latency_budget_ms)
+        return min(max(by_queue, by_latency), len(TIERS) - 1)
+
+    def enter(self) -> int:
+        with self._lock:
+            tier = self._pick()
+            self.in_flight += 1
+            self.tier_counts[TIERS[tier].name] += 1
+        if tier > 0:
+            logger.info(f"[fidelity] 부하로 분석 단계 하향: {TIERS[tier].name} "
+                        f"(처리 중 {self.in_flight}건, 지연 EWMA {self.latency_ewma_ms:.0f}ms)")
+        return tier
+
+    def exit(self, elapsed_ms: float):
+        with self._lock:
+            self.in_flight -= 1
+            if self.latency_ewma_ms == 0.0:
+                self.latency_ewma_ms = elapsed_ms
+            else:
+                self.latency_ewma_ms += LATENCY_EWMA_ALPHA * (elapsed_ms - self.latency_ewma_ms)
+
+    @contextmanager
+    def track(self):
+        tier = self.enter()
+        start = time.perf_counter()
+        try:
+            yield tier
+        finally:
+            self.exit((time.perf_counter() - start) * 1000)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "in_flight": self.in_flight,
+                "latency_ewma_ms": round(self.latency_ewma_ms, 1),
+                "tier_counts": dict(self.tier_counts),
+            }
@@ -15,6 +15,16 @@ FACE_PARTS = {
     "right_chin": [152, 379, 378, 400],
 }
 
+# 좌우 이미지를 반전 비교하는 부위: 결과 키 → (왼쪽, 오른쪽)
+MATCH_PAIRS = {
+    "eyes": ("left_eye", "right_eye"),
+    "ears": ("left_ear", "right_ear"),
+    "chin": ("left_chin", "right_chin"),
+}
+
+# 이미지 하나를 반으로 나눠 비교하는 부위 (비교 후 left_/right_ 반쪽 이미지로 대체)
+SPLIT_PARTS = ("nose", "mouth")
+
 # 비율 기반 패딩 설정 (비율: 0.0 ~ 1.0)
 PADDING_RATIO_MAP = {
     'left_eye': {'top': 0.02, 'bottom': 0.02, 'left': 0.04, 'right': 0.04},
@@ -27,33 +37,50 @@ PADDING_RATIO_MAP = {
     "right_chin": {'top': 0.12, 'bottom': 0.02, 'left': 0.00, 'right': 0.10},
 }
 
-# 영역별 자르기 함수
-def devide_region(image_pil: Image.Image, landmarks: list[tuple], indices: list[int], padding_ratio: dict) -> Image.Image:
+# 영역별 자르기 박스 (min_x, min_y, max_x, max_y) 계산
+# frame_size: 얼굴 ROI 이미지를 넘길 때 원본 프레임 크기 (패딩 비율 기준)
+def get_region_box(landmarks: list[tuple], indices: list[int], padding_ratio: dict,
+                   image_size: tuple[int, int], frame_size: tuple[int, int] | None = None) -> tuple:
     points = [landmarks[i] for i in indices if 0 <= i < len(landmarks)]
     xs = [p[0] for p in points]
     ys = [p[1] for p in points]
 
-    width, height = image_pil.size
+    width, height = image_size
+    pad_w, pad_h = frame_size or (width, height)
 
     # 비율 기반 padding 계산
-    top = int(padding_ratio.get('top', 0.02) * height)
-    bottom = int(padding_ratio.get('bottom', 0.02) * height)
-    left = int(padding_ratio.get('left', 0.02) * width)
-    right = int(padding_ratio.get('right', 0.02) * width)
+    top = int(padding_ratio.get('top', 0.02) * pad_h)
+    bottom = int(padding_ratio.get('bottom', 0.02) * pad_h)
+    left = int(padding_ratio.get('left', 0.02) * pad_w)
+    right = int(padding_ratio.get('right', 0.02) * pad_w)
 
     min_x = max(min(xs) - left, 0)
     max_x = min(max(xs) + right, width)
     min_y = max(min(ys) - top, 0)
     max_y = min(max(ys) + bottom, height)
 
-    return image_pil.crop((min_x, min_y, max_x, max_y))
+    return (min_x, min_y, max_x, max_y)
+
+# 영역별 자르기 함수
+def devide_region(image_pil: Image.Image, landmarks: list[tuple], indices: list[int], padding_ratio: dict,
+                  frame_size: tuple[int, int] | None = None) -> Image.Image:
+    return image_pil.crop(get_region_box(landmarks, indices, padding_ratio, image_pil.size, frame_size))
+
+# 얼굴 부위별 자르기 박스 (얼굴 ROI 계산용)
+def get_face_part_boxes(landmarks: list[tuple], image_size: tuple[int, int],
+                        frame_size: tuple[int, int] | None = None) -> dict[str, tuple]:
+    return {
+        part_name: get_region_box(landmarks, indices, PADDING_RATIO_MAP.get(part_name, {}), image_size, frame_size)
+        for part_name, indices in FACE_PARTS.items()
+    }
 
 # 얼굴 부위별 검출
-def get_face_parts(landmarks: list[tuple], image_pil: Image.Image) -> dict[str, Image.Image]:
+def get_face_parts(landmarks: list[tuple], image_pil: Image.Image,
+                   frame_size: tuple[int, int] | None = None) -> dict[str, Image.Image]:
     parts = {}
     for part_name, indices in FACE_PARTS.items():
         padding_ratio = PADDING_RATIO_MAP.get(part_name, {})
-        cropped = devide_region(image_pil, landmarks, indices, padding_ratio)
+        cropped = devide_region(image_pil, landmarks, indices, padding_ratio, frame_size)
         parts[part_name] = cropped
     return parts
 
@@ -112,33 +139,18 @@ def weighted_average(score_dict, weights):
 def compare_match_parts_from_images(parts: dict[str, Image.Image]) -> dict[str, float | None]:
     results: dict[str, float | None] = {}
 
-    results["eyes"] = (
-        compare_ssim_flipped_images(parts["left_eye"], parts["right_eye"])
-        if "left_eye" in parts and "right_eye" in parts else None
-    )
-
-    results["ears"] = (
-        compare_ssim_flipped_images(parts["left_ear"], parts["right_ear"])
-        if "left_ear" in parts and "right_ear" in parts else None
-    )
-
-    if "nose" in parts:
-        score, left_nose, right_nose = compare_split_match(parts["nose"])
-        results["nose"] = score
-        parts["left_nose"] = left_nose
-        parts["right_nose"] = right_nose
-        del parts["nose"]  # 원본 nose 이미지 삭제
-
-    if "mouth" in parts:
-        score, left_mouth, right_mouth = compare_split_match(parts["mouth"])
-        results["mouth"] = score
-        parts["left_mouth"] = left_mouth
-        parts["right_mouth"] = right_mouth
-        del parts["mouth"]  # 원본 mouth 이미지 삭제
-
-    results["chin"] = (
-        compare_ssim_flipped_images(parts["left_chin"], parts["right_chin"])
-        if "left_chin" in parts and "right_chin" in parts else None
-    )
+    for key, (left, right) in MATCH_PAIRS.items():
+        results[key] = (
+            compare_ssim_flipped_images(parts[left], parts[right])
+            if left in parts and right in parts else None
+        )
+
+    for part in SPLIT_PARTS:
+        if part in parts:
+            score, left_half, right_half = compare_split_match(parts[part])
+            results[part] = score
+            parts[f"left_{part}"] = left_half
+            parts[f"right_{part}"] = right_half
+            del parts[part]  # 원본 이미지 삭제
 
     return results
\ No newline at end of file
@@ -0,0 +1,130 @@
+# analyzer/pipeline.py
+
+from functools import partial
+
+from PIL import Image
+from logger import logger
+from analyzer.analyze_symmetry import calculate_symmetry
+from analyzer.image_devide import (MATCH_PAIRS, SPLIT_PARTS, compare_split_match, compare_ssim_flipped_images,
+                                   get_face_parts)
+from analyzer.visualize_result import generate_result_image
+from utils.image_utils import encode_image_to_base64
+from utils.stage_scheduler import StageScheduler
+
+# 최종 점수 부위별 가중치
+WEIGHTS = {
+    "eyes": 0.30,
+    "nose": 0.20,
+    "mouth": 0.20,
+    "chin": 0.20,
+    "ears": 0.10
+}
+
+def calculate_final_scores(part_scores: dict, match_scores: dict) -> tuple[dict, float]:
+    final_scores = {}
+    weighted_total = 0.0
+    for part, weight in WEIGHTS.items():
+        match = match_scores.get(part, 0)
+        if part == "chin":
+            final = round(match, 2)
+        else:
+            sym = part_scores.get(part, 0)
+            final = round((sym * 0.5 + match * 0.5), 2)
+        final_scores[part] = final
+        weighted_total += final * weight
+
+    return final_scores, round(weighted_total, 2)
+
+def analyze_aligned_face(
+    image: Image.Image,
+    landmarks,
+    align_landmarks,
+    align_image: Image.Image,
+    frame_size: tuple[int, int] | None = None,
+    roi: bool = False,
+    max_parallel: int = 1,
+    render_size: tuple[int, int] = (800, 1000),
+    images: bool = True,
+    landmark_scale: float = 1.0
+) -> dict:
+    """
+    정렬된 랜드마크 이후의 단계(대칭률, 부위별 일치율, 부위 이미지 인코딩,
+    결과 이미지 렌더링·인코딩)를 의존성 그래프로 실행합니다.
+
+    서로 독립적인 SSIM 비교와 PNG 인코딩은 공유 스레드 풀에서 최대
+    max_parallel 개까지 동시에 실행되고, 임계 경로가 타이밍 로그로 남습니다.
+    images=False 이면 이미지 인코딩·결과 렌더링 없이 점수만 계산합니다.
+    landmark_scale: 정렬 랜드마크 → 원본 프레임 좌표 배율 (프록시 해상도 분석 시 1 / 축소 배율).
+    대칭률은 픽셀 거리 기반이므로 항상 원본 프레임 좌표로 계산합니다.
+
+    Returns:
+        /analyze 응답 본문 dict
+    """
+    logger.debug("대칭률 계산 시작")
+    frame_landmarks = align_landmarks
+    if landmark_scale != 1.0:
+        frame_landmarks = [(x * landmark_scale, y * landmark_scale) for x, y in align_landmarks]
+    symmetry_score, part_scores = calculate_symmetry(frame_landmarks)
+    logger.debug(f"총 대칭률 점수: {symmetry_score}")
+    logger.debug(f"부위별 대칭률 점수: {part_scores}")
+
+    logger.debug("일치율 계산 시작")
+    parts = get_face_parts(align_landmarks, align_image, frame_size)
+    scheduler = StageScheduler(max_parallel=max_parallel)
+
+    # 등록 순서가 실행 우선순위: 최종 점수 → 결과 이미지로 이어지는 임계 경로를 먼저 등록
+    match_stages = {}
+    for key, (left, right) in MATCH_PAIRS.items():
+        match_stages[key] = scheduler.add(
+            f"match_{key}", partial(compare_ssim_flipped_images, parts[left], parts[right]))
+    for part in SPLIT_PARTS:
+        match_stages[part] = scheduler.add(f"split_{part}", partial(compare_split_match, parts[part]))
+
+    def final_scores_stage(*matches):
+        match_scores = {
+            key: (match[0] if key in SPLIT_PARTS else match)
+            for key, match in zip(match_stages, matches)
+        }
+        logger.debug(f"부위별 일치율 : {match_scores}")
+        return calculate_final_scores(part_scores, match_scores)
+
+    scheduler.add("final_scores", final_scores_stage, deps=tuple(match_stages.values()))
+    encode_stages = {}
+    if images:
+        scheduler.add(
+            "result_image",
+            lambda scores: generate_result_image(image, landmarks, scores[1], scores[0],
+                                                 roi=roi, render_size=render_size),
+            deps=("final_scores",))
+        scheduler.add("encode_result", lambda result: encode_image_to_base64(result[0]), deps=("result_image",))
+
+        # 응답의 부위 이미지 순서는 compare_match_parts_from_images 가 남기는 parts 순서와 동일하게 유지
+        for left, right in MATCH_PAIRS.values():
+            for name in (left, right):
+                encode_stages[name] = scheduler.add(f"encode_{name}", partial(encode_image_to_base64, parts[name]))
+        for part in SPLIT_PARTS:
+            encode_stages[f"left_{part}"] = scheduler.add(
+                f"encode_left_{part}", lambda split: encode_image_to_base64(split[1]), deps=(match_stages[part],))
+            encode_stages[f"right_{part}"] = scheduler.add(
+                f"encode_right_{part}", lambda split: encode_image_to_base64(split[2]), deps=(match_stages[part],))
+
+    results = scheduler.run()
+    scheduler.log_timings("analyze")
+
+    final_scores, final_score = results["final_scores"]
+    logger.debug(f"일치율 + 대칭률 : {final_scores}")
+    logger.debug(f"최종 대칭 점수 : {final_score}")
+
+    if not images:
+        return {
+            "final_scores": final_scores,
+            "final_score": final_score
+        }
+
+    return {
+        "parts_images": {name: results[stage] for name, stage in encode_stages.items()},
+        "final_scores": final_scores,
+        "final_score": final_score,
+        "result_image": results["encode_result"],
+        "total_distance": results["result_image"][1]
+    }
@@ -0,0 +1,146 @@
+# analyzer/service.py
+#
+# /analyze, /debug_landmarks 의 CPU 작업 본체.
+# Flask(app.py)와 ASGI(asgi.py) 프런트엔드가 같은 응답 계약을 공유하도록
+# 이미지 바이트를 받아 (응답 본문 dict, HTTP 상태 코드)를 반환합니다.
+# 프로세스 풀 워커에서 호출할 수 있도록 모두 모듈 최상위 함수로 둡니다.
+
+import json
+import os
+
+import cv2
+import numpy as np
+from logger import logger
+from analyzer.detect_face import (detect_landmarks, align_and_detect_landmarks, align_and_detect_landmarks_roi,
+                                  face_mesh_session, get_proxy_scale)
+from analyzer.fidelity import TIERS
+from analyzer.pipeline import analyze_aligned_face
+from utils.image_utils import encode_image_to_base64
+from utils.profiler import profiling
+from utils.shm_transport import ShmArray, ShmSlot, attach_view, fits, write_bytes
+from utils.stage_scheduler import set_stage_pool_size
+from utils.visual_utils import draw_landmark_mesh, draw_landmark_points, draw_specific_points
+
+# 얼굴 ROI 모드: 정렬·부위 크롭·결과 렌더링을 얼굴 주변 영역에서만 수행
+FACE_ROI_MODE = os.getenv("FACE_ROI_MODE", "0") == "1"
+
+# 요청 하나가 공유 스레드 풀에서 동시에 실행할 수 있는 최대 스테이지 수 (1 = 직렬)
+ANALYZE_PARALLELISM = int(os.getenv("ANALYZE_PARALLELISM", "4"))
+
+def warm_up(parallelism: int | None = None):
+    """
+    워커 프로세스 초기화용: 무거운 모듈 import 와 FaceMesh 모델 로딩을
+    첫 요청 전에 끝내 둡니다. 만든 FaceMesh 는 이 프로세스의 요청들이 재사용합니다.
+
+    parallelism 이 주어지면 이 프로세스의 요청당 스테이지 병렬도, 스테이지 스레드 풀,
+    OpenCV 스레드 수를 모두 그 값으로 맞춰 워커 수 x CPU 수만큼 스레드가 늘지 않게 합니다.
+    """
+    global ANALYZE_PARALLELISM
+    if parallelism is not None:
+        ANALYZE_PARALLELISM = max(int(parallelism), 1)
+        set_stage_pool_size(ANALYZE_PARALLELISM)
+        cv2.setNumThreads(ANALYZE_PARALLELISM)
+
+    with face_mesh_session() as face_mesh:
+        face_mesh.process(np.zeros((64, 64, 3), dtype=np.uint8))
+    logger.info(f"분석 워커 준비 완료 (pid={os.getpid()}, 스테이지 병렬도 {ANALYZE_PARALLELISM})")
+
+# mesh=True 이면 랜드마크 점 아래에 FaceMesh 테셀레이션 메쉬도 그림
+def debug_landmarks_image(image_bytes: bytes, mesh: bool = False) -> tuple[dict, int]:
+    try:
+        landmarks, image = detect_landmarks(image_bytes)
+        if landmarks is None:
+            logger.warning("얼굴이 감지되지 않음")
+            return {"error": "No face detected"}, 400
+
+        logger.info(f"검출된 랜드마크 개수: {len(landmarks)}")
+        debug_img = draw_landmark_mesh(image, landmarks) if mesh else image
+        debug_img = draw_landmark_points(debug_img, landmarks, color="lime", radius=2)
+        debug_img = draw_specific_points(debug_img, landmarks, [234, 454], color="red", radius=6)
+        img_data = encode_image_to_base64(debug_img)
+
+        logger.info("디버그 랜드마크 이미지 생성 및 전송 완료")
+        return {"image_base64": img_data}, 200
+
+    except Exception as e:
+        logger.exception("디버그 랜드마크 처리 중 예외 발생")
+        return {"error": str(e)}, 500
+
+# tier: analyzer.fidelity.TIERS 인덱스 (0 = 전체 파이프라인)
+def analyze_image(image_bytes: bytes, tier: int = 0) -> tuple[dict, int]:
+    fidelity = TIERS[tier]
+    try:
+        logger.debug(f"얼굴 랜드마크 추출 시도 (분석 단계: {fidelity.name})")
+        landmarks, image = detect_landmarks(image_bytes, max_side=fidelity.max_side)
+        if landmarks is None:
+            logger.warning("얼굴이 감지되지 않음")
+            return {"error": "No face detected"}, 400
+
+        logger.debug(f"랜드마크 수: {len(landmarks)}")
+
+        roi = FACE_ROI_MODE
+        if roi:
+            align_landmarks, align_image, face_roi = align_and_detect_landmarks_roi(
+                image_bytes, max_side=fidelity.max_side, second_pass=fidelity.second_pass)
+            frame_size = face_roi.frame_size if face_roi else None
+            if align_landmarks is None:
+                # 얼굴 ROI 재검출 실패: 1차 검출은 성공했으므로 전체 프레임 경로로 다시 시도
+                logger.warning("얼굴 ROI 정렬 실패: 전체 프레임 정렬로 대체")
+                roi = False
+
+        if not roi:
+            align_landmarks, align_image = align_and_detect_landmarks(
+                image_bytes, max_side=fidelity.max_side, second_pass=fidelity.second_pass)
+            frame_size = None
+
+        # 프록시 해상도 단계도 대칭률은 원본 좌표로 계산해 부하에 따라 점수가 바뀌지 않게 함
+        landmark_scale = 1.0 / get_proxy_scale(image_bytes, fidelity.max_side)
+
+        response = analyze_aligned_face(
+            image, landmarks, align_landmarks, align_image,
+            frame_size=frame_size, roi=FACE_ROI_MODE, max_parallel=ANALYZE_PARALLELISM,
+            render_size=fidelity.render_size, images=fidelity.images, landmark_scale=landmark_scale
+        )
+        response["tier"] = fidelity.name
+
+        logger.info("분석 성공 및 응답 반환")
+        logger.info("결과 이미지 Base64 생성 및 전송 완료")
+        return response, 200
+
+    except Exception as e:
+        logger.exception("분석 중 예외 발생")
+        return {"error": str(e)}, 500
+
+# 프로세스 풀 워커에서 엔드포인트 이름으로 찾는 처리 함수
+HANDLERS = {
+    "analyze": analyze_image,
+    "debug_landmarks": debug_landmarks_image,
+}
+
+def handle_request(endpoint: str, image: ShmArray | bytes, out_slot: ShmSlot | None = None,
+                   profile: bool = False, **options):
+    """
+    프로세스 풀 워커 진입점.
+
+    image 가 공유 메모리 디스크립터면 업로드 바이트를 복사 없이 뷰로 읽고,
+    직렬화한 JSON 응답 본문이 out_slot 에 들어가면 디스크립터만 돌려줍니다.
+    options 는 처리 함수에 그대로 전달됩니다 (예: analyze 의 tier).
+    profile=True 이면 처리 과정을 프로파일링해 요청 프로세스로 통계를 돌려줍니다.
+
+    Returns:
+        (HTTP 상태 코드, 응답 본문 디스크립터 또는 None, 응답 본문 bytes 또는 None,
+         pstats 통계 dict 또는 None)
+    """
+    if isinstance(image, ShmArray):
+        image = attach_view(image)
+
+    with profiling(profile) as session:
+        body, status = HANDLERS[endpoint](image, **options)
+        # starlette JSONResponse 와 같은 직렬화 규칙
+        encoded = json.dumps(body, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+    profile_stats = session.stats().stats if session is not None else None
+
+    if fits(out_slot, len(encoded)):
+        return status, write_bytes(out_slot, encoded), None, profile_stats
+    return status, None, encoded, profile_stats
@@ -6,6 +6,7 @@ from math import hypot
 from PIL import Image, ImageDraw, ImageFont, ImageOps
 from logger import logger
 from utils.face_utils import estimate_position
+from utils.overlay_utils import OverlayRenderer
 
 # 폰트 경로 설정 (고정 크기)
 FONT_URL = "https://github.com/googlefonts/noto-cjk/raw/main/Sans/OTF/Korean/NotoSansKR-Regular.ttf"
@@ -17,6 +18,9 @@ if not os.path.exists(FONT_PATH):
         f.write(resp.content)
     logger.info("폰트 다운로드 완료: NotoSansKR-Regular.ttf")
 
+# total_distance 기준 해상도 가로 폭: 결과 이미지를 더 작게 렌더링해도 거리는 이 폭 기준으로 보고
+REFERENCE_RENDER_W = 800
+
 def draw_dotted_line(draw, start, end, color="blue", width=2, dash_length=10):
     total = hypot(end[0] - start[0], end[1] - start[1])
     num = int(total // dash_length)
@@ -46,7 +50,8 @@ def crop_to_face_center_with_zoom(
     landmarks,
     h_ratio: float = 0.5,
     v_ratio: float = 4/5,
-    min_face_occupancy: float = 0.6
+    min_face_occupancy: float = 0.6,
+    roi: bool = False
 ):
     orig_w, orig_h = image.size
 
@@ -86,9 +91,8 @@ def crop_to_face_center_with_zoom(
     scale = max(1.0, *needed)
     scale = min(scale, 1.25)  # 최대 1.25배 확대 제한
 
-    # 이미지 및 랜드마크 확대
+    # 랜드마크 확대 (이미지 확대 크기 기준)
     new_w, new_h = int(orig_w * scale), int(orig_h * scale)
-    image = image.resize((new_w, new_h), Image.LANCZOS)
     landmarks = [(x * scale, y * scale) for x, y in landmarks]
     face_cx *= scale
     face_cy *= scale
@@ -99,11 +103,23 @@ def crop_to_face_center_with_zoom(
     left = max(0, min(int(face_cx - crop_w * h_ratio), new_w - crop_w))
     top  = max(0, min(int(face_cy - crop_h * v_ratio), new_h - crop_h))
 
-    cropped = image.crop((left, top, left + crop_w, top + crop_h))
+    if not roi:
+        # 전체 프레임 확대 후 크롭
+        image = image.resize((new_w, new_h), Image.LANCZOS)
+        cropped = image.crop((left, top, left + crop_w, top + crop_h))
+    elif (new_w, new_h) == (orig_w, orig_h):
+        cropped = image.crop((left, top, left + crop_w, top + crop_h))
+    else:
+        # 크롭 영역에 해당하는 원본 박스만 리샘플링 (전체 확대 후 크롭과 동일한 픽셀 샘플링)
+        sx, sy = orig_w / new_w, orig_h / new_h
+        box = (left * sx, top * sy, (left + crop_w) * sx, (top + crop_h) * sy)
+        cropped = image.resize((crop_w, crop_h), Image.LANCZOS, box=box)
+
     new_landmarks = [(x - left, y - top) for x, y in landmarks]
     return cropped, new_landmarks
 
-def generate_result_image(image: Image.Image, landmarks, score, part_scores):
+def generate_result_image(image: Image.Image, landmarks, score, part_scores, roi: bool = False,
+                          render_size: tuple[int, int] = (800, 1000)):
     logger.debug("결과 이미지 시각화 시작")
 
     # 1) 얼굴 4:5 비율 확대 & 크롭
@@ -111,11 +127,12 @@ def generate_result_image(image: Image.Image, landmarks, score, part_scores):
         image, landmarks,
         h_ratio=0.5,
         v_ratio=6/9,
-        min_face_occupancy=0.5
+        min_face_occupancy=0.5,
+        roi=roi
     )
 
-    # 2) 고정 해상도 리사이즈
-    STANDARD_W, STANDARD_H = 800, 1000
+    # 2) 고정 해상도 리사이즈 (기본 800x1000, 고부하 단계에서는 더 작게)
+    STANDARD_W, STANDARD_H = render_size
     scale_img = STANDARD_W / image.width
     image = image.resize((STANDARD_W, STANDARD_H), Image.LANCZOS)
     landmarks = [(x * scale_img, y * scale_img) for x, y in landmarks]
@@ -170,10 +187,9 @@ def generate_result_image(image: Image.Image, landmarks, score, part_scores):
     box_height = int(title_size * 3 + vertical_padding * 2)
     start_y = vertical_padding
 
-    overlay = Image.new('RGBA', (w, h), (0, 0, 0, 0))
-    od = ImageDraw.Draw(overlay)
-    od.rectangle([20, start_y, w - 20, start_y + box_height], fill=(0, 0, 0, 180))
-    image = Image.alpha_composite(image, overlay)
+    renderer = OverlayRenderer((w, h))
+    renderer.rectangle((20, start_y, w - 20, start_y + box_height), fill=(0, 0, 0, 180))
+    image = renderer.composite(image, inplace=True)
     draw = ImageDraw.Draw(image)
 
     def safe_text(draw_obj, text, x, y, font, fill, anchor='mm'):
@@ -194,7 +210,8 @@ def generate_result_image(image: Image.Image, landmarks, score, part_scores):
     safe_text(draw, f'당신의 대칭률은 {score:.2f}%!!', image_center_x, start_y + vertical_padding + title_size * 0.5, font_title, 'white')
     safe_text(draw, message, image_center_x, start_y + vertical_padding + title_size * 2.5, font_message, 'white')
 
-    # 10) 거리 시각화 (기울어진 대칭축에 대한 최단 거리)
+    # 10) 거리 시각화 (기울어진 대칭축에 대한 최단 거리, REFERENCE_RENDER_W 기준 px)
+    distance_scale = REFERENCE_RENDER_W / w
     highlights = [
         (61,  'blue', 'left_mouth'), (291, 'blue', 'right_mouth'),
         (133, 'blue', 'left_eye'),   (362, 'blue', 'right_eye'),
@@ -206,18 +223,19 @@ def generate_result_image(image: Image.Image, landmarks, score, part_scores):
     for idx, color, name in highlights:
         x_i, y_i = landmarks[idx]
         proj = project_point_to_line(x_i, y_i, pt1, pt2)
+        # 불투명 점선은 합성 버퍼 없이 이미지에 바로 그림 (반투명 메시지 박스만 버퍼로 합성)
         draw_dotted_line(draw, (x_i, y_i), proj, color=color)
 
         text_x = int((x_i + proj[0]) / 2)
         text_y = int((y_i + proj[1]) / 2)
-        safe_text(draw, f"{int(hypot(x_i - proj[0], y_i - proj[1]))}px",
+        safe_text(draw, f"{int(hypot(x_i - proj[0], y_i - proj[1]) * distance_scale)}px",
                   text_x, text_y, font_face, color)
 
-        distance_dict[name] = round(hypot(x_i - proj[0], y_i - proj[1]), 0)
+        distance_dict[name] = round(hypot(x_i - proj[0], y_i - proj[1]) * distance_scale, 0)
 
     # 11) 부위별 라벨
-    LABEL_W, LABEL_H = 150, 50
-    PADDING = 20
+    LABEL_W, LABEL_H = int(150 * scale_factor), int(50 * scale_factor)
+    PADDING = int(20 * scale_factor)
     label_indices = {'눈': 33, '코': 1, '입': 13, '귀': 234, '턱': 397}
     static_pos = {}
     for part, idx in label_indices.items():
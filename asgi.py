@@ -0,0 +1,241 @@
+# asgi.py
+#
+# 비동기(ASGI) 프런트엔드: app.py 와 같은 /analyze, /debug_landmarks 계약을 제공합니다.
+# 업로드 수신과 응답 전송은 이벤트 루프에서 비동기로 처리하고,
+# CPU 작업(analyzer 파이프라인)은 미리 예열된 워커 프로세스 풀에 넘깁니다.
+# 업로드 바이트와 응답 본문은 공유 메모리 슬롯(utils.shm_transport)으로 주고받고
+# 프로세스 큐에는 작은 디스크립터만 보냅니다. 슬롯이 모자라거나 크기를 넘으면 피클 전송.
+# 따라서 동시 연결 수와 분석 동시성(ANALYSIS_WORKERS)을 따로 조절할 수 있습니다.
+#
+# 실행: uvicorn asgi:app --host 0.0.0.0 --port 5000
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
+
+from starlette.applications import Starlette
+from starlette.datastructures import UploadFile
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from analyzer.fidelity import TierSelector
+from analyzer.service import handle_request, warm_up
+from logger import logger
+from utils.profiler import PROFILE_HEADER, has_profile_token, profile_window, should_profile
+from utils.shm_transport import SHM_SLOT_BYTES, ShmRing, fit_slot_count, write_bytes
+
+# 분석 워커 프로세스 수 (CPU 작업 동시성)
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", str(os.cpu_count() or 2)))
+
+# 워커 하나가 요청 안에서 쓰는 스테이지 병렬도·스레드 수 (기본: CPU 를 워커 수로 나눈 값)
+WORKER_PARALLELISM = int(os.getenv(
+    "WORKER_PARALLELISM", str(max((os.cpu_count() or 2) // max(ANALYSIS_WORKERS, 1), 1))))
+
+# 공유 메모리 슬롯 수 (요청 하나당 입력/출력 2개 사용, 0 이면 피클 전송만 사용)
+SHM_SLOTS = int(os.getenv("SHM_SLOTS", str(ANALYSIS_WORKERS * 4)))
+
+# 전역 호출 카운터
+call_counters = {
+    "debug_landmarks": 0,
+    "analyze": 0
+}
+
+# 부하 적응형 분석 단계 선택기 (처리 중 요청 수 = 워커 풀 대기 + 실행)
+tier_selector = TierSelector()
+
+async def _read_image(request: Request) -> bytes | None:
+    form = await request.form()
+    file = form.get("image")
+    if not isinstance(file, UploadFile):
+        return None
+    return await file.read()
+
+async def _start_pool() -> ProcessPoolExecutor:
+    # MediaPipe/OpenCV 는 fork 이후 상태가 불안정할 수 있어 spawn 사용
+    pool = ProcessPoolExecutor(
+        max_workers=ANALYSIS_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=warm_up,
+        initargs=(WORKER_PARALLELISM,)
+    )
+    # 워커는 작업 제출 시 생성되므로 워커 수만큼 빈 작업을 보내 미리 띄움
+    loop = asyncio.get_running_loop()
+    await asyncio.gather(*(loop.run_in_executor(pool, os.getpid) for _ in range(ANALYSIS_WORKERS)))
+    return pool
+
+async def _replace_pool(app: Starlette, broken: ProcessPoolExecutor):
+    # 워커 하나가 죽으면(세그폴트, OOM) 풀 전체가 BrokenProcessPool 상태로 남으므로 새 풀로 교체
+    async with app.state.pool_lock:
+        if app.state.pool is not broken:
+            return  # 다른 요청이 이미 교체함
+        logger.error("분석 워커 프로세스 비정상 종료: 워커 풀 재생성")
+        broken.shutdown(wait=False, cancel_futures=True)
+        app.state.pool = await _start_pool()
+        logger.info(f"분석 워커 풀 재생성 완료: 워커 {ANALYSIS_WORKERS}개")
+
+async def _submit(app: Starlette, *args, **kwargs):
+    pool = app.state.pool
+    try:
+        return pool, pool.submit(*args, **kwargs)
+    except BrokenProcessPool:
+        # 앞선 요청에서 깨진 풀: 아직 실행 전인 작업이므로 교체한 풀에 한 번 더 제출
+        await _replace_pool(app, pool)
+        pool = app.state.pool
+        return pool, pool.submit(*args, **kwargs)
+
+async def _run_in_pool(request: Request, endpoint: str, image_bytes: bytes, **options) -> Response:
+    ring = request.app.state.ring
+
+    in_slot = out_slot = None
+    if ring is not None:
+        in_slot, out_slot = ring.acquire_pair(len(image_bytes))
+
+    image = write_bytes(in_slot, image_bytes) if in_slot is not None else image_bytes
+    pool = future = None
+    try:
+        for attempt in range(2):
+            pool, future = await _submit(request.app, handle_request, endpoint, image, out_slot, **options)
+            try:
+                status, body_desc, body, profile_stats = await asyncio.wrap_future(future)
+                break
+            except BrokenProcessPool:
+                # 워커 하나가 죽으면 그 풀의 대기·실행 중 작업이 모두 실패하므로 교체한 풀에 한 번 다시 제출
+                # (깨진 풀의 워커는 모두 종료되어 슬롯에 더 쓰지 않음). 새 풀도 깨지면 이 요청을 실패 처리
+                await _replace_pool(request.app, pool)
+                if attempt:
+                    raise
+                logger.warning("분석 워커 풀 비정상 종료: 교체한 풀에 요청 재제출")
+        if profile_stats is not None:
+            # pstats 합산은 CPU 작업이므로 이벤트 루프 밖에서 실행
+            await asyncio.to_thread(profile_window.add, profile_stats)
+        if body_desc is not None:
+            body = ring.view(body_desc).tobytes()
+        return Response(body, status_code=status, media_type="application/json")
+
+    except BrokenProcessPool:
+        # 재제출한 요청까지 풀을 깨뜨림: 이 입력이 워커를 죽이는 것으로 보고 실패 처리
+        logger.exception("분석 워커 프로세스 비정상 종료")
+        return JSONResponse({"error": "Analysis worker crashed"}, status_code=500)
+
+    except Exception as e:
+        logger.exception("분석 워커 실행 중 예외 발생")
+        return JSONResponse({"error": str(e)}, status_code=500)
+
+    finally:
+        # 클라이언트가 끊겨도 워커가 슬롯에 쓰는 중일 수 있으므로 작업이 끝난 뒤 반납
+        if ring is not None:
+            ring.release_when_done(future, in_slot, out_slot)
+
+# ──────────────────────────────────────────────────────────────────────────────
+# DEBUG LANDMARKS ENDPOINT
+async def debug_landmarks(request: Request):
+    # 호출 횟수 증가 및 로그
+    call_counters["debug_landmarks"] += 1
+    logger.info(f"[debug_landmarks] 호출 횟수: {call_counters['debug_landmarks']}회")
+
+    logger.info("디버그 랜드마크 요청 수신됨")
+    image_bytes = await _read_image(request)
+    if image_bytes is None:
+        logger.warning("요청에 이미지 파일 없음")
+        return JSONResponse({"error": "No image file provided"}, status_code=400)
+
+    return await _run_in_pool(request, "debug_landmarks", image_bytes, mesh=request.query_params.get("mesh") == "1")
+
+# ──────────────────────────────────────────────────────────────────────────────
+# ANALYZE ENDPOINT
+async def analyze(request: Request):
+    # 호출 횟수 증가 및 로그
+    call_counters["analyze"] += 1
+    logger.info(f"[analyze] 호출 횟수: {call_counters['analyze']}회")
+
+    logger.info("분석 요청 수신됨 v5")
+    image_bytes = await _read_image(request)
+    if image_bytes is None:
+        logger.warning("요청에 이미지 파일 없음")
+        return JSONResponse({"error": "No image file provided"}, status_code=400)
+
+    with tier_selector.track() as tier:
+        # 프로파일링은 실제 분석이 도는 워커 프로세스에서 수행하고 통계만 돌려받음
+        sampled = should_profile(request.headers.get(PROFILE_HEADER))
+        return await _run_in_pool(request, "analyze", image_bytes, profile=sampled, tier=tier)
+
+# ──────────────────────────────────────────────────────────────────────────────
+# METRICS ENDPOINT
+async def metrics(request: Request):
+    body = {
+        "call_counters": call_counters,
+        "fidelity": tier_selector.snapshot()
+    }
+    # 프로파일 상태는 프로파일 토큰이 있는 요청에만 노출
+    if has_profile_token(request.headers.get(PROFILE_HEADER)):
+        body["profile"] = profile_window.info()
+    return JSONResponse(body)
+
+# ──────────────────────────────────────────────────────────────────────────────
+# PROFILE ENDPOINT (샘플링된 /analyze 요청의 합산 프로파일 다운로드)
+async def profile(request: Request):
+    # 내부 경로·함수 이름이 담기므로 PROFILE_HEADER_TOKEN 이 설정되고 헤더가 일치할 때만 제공
+    if not has_profile_token(request.headers.get(PROFILE_HEADER)):
+        return JSONResponse({"error": "Not Found"}, status_code=404)
+
+    fmt = request.query_params.get("format", "collapsed")
+    if fmt == "pstats":
+        return Response(await asyncio.to_thread(profile_window.export_pstats), media_type="application/octet-stream",
+                        headers={"Content-Disposition": "attachment; filename=analyze.prof"})
+    if fmt == "collapsed":
+        return Response(await asyncio.to_thread(profile_window.export_collapsed), media_type="text/plain",
+                        headers={"Content-Disposition": "attachment; filename=analyze.collapsed"})
+    return JSONResponse({"error": "format must be 'pstats' or 'collapsed'"}, status_code=400)
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 워커 풀 수명 주기
+@asynccontextmanager
+async def lifespan(app: Starlette):
+    # 공유 메모리 링은 워커보다 먼저 만들어 resource_tracker 를 워커와 공유
+    # /dev/shm 여유 공간에 맞춰 슬롯 수를 줄이고, 요청 하나에 필요한 2개도 안 되면 피클 전송만 사용
+    ring = None
+    slot_count = fit_slot_count(SHM_SLOTS, SHM_SLOT_BYTES)
+    if slot_count >= 2:
+        try:
+            ring = ShmRing(slot_count, SHM_SLOT_BYTES)
+        except OSError:
+            logger.exception("공유 메모리 링 생성 실패: 피클 전송으로 대체")
+
+    app.state.pool = await _start_pool()
+    app.state.pool_lock = asyncio.Lock()
+    app.state.ring = ring
+    logger.info(f"ASGI 앱 시작: 분석 워커 {ANALYSIS_WORKERS}개 (워커당 병렬도 {WORKER_PARALLELISM})")
+    try:
+        yield
+    finally:
+        app.state.pool.shutdown(wait=True, cancel_futures=True)
+        if ring is not None:
+            ring.close()
+        logger.info("ASGI 앱 종료: 분석 워커 정리 완료")
+
+app = Starlette(
+    routes=[
+        Route("/debug_landmarks", debug_landmarks, methods=["POST"]),
+        Route("/analyze", analyze, methods=["POST"]),
+        Route("/metrics", metrics, methods=["GET"]),
+        Route("/profile", profile, methods=["GET"]),
+    ],
+    middleware=[
+        # 운영용: 정확한 출처만 허용 (flask_cors 처럼 POST 프리플라이트와 요청 헤더 허용)
+        Middleware(CORSMiddleware, allow_origins=["https://faicial.site"],
+                   allow_methods=["GET", "POST"], allow_headers=["*"])
+    ],
+    lifespan=lifespan
+)
+
+if __name__ == "__main__":
+    import uvicorn
+
+    logger.info("ASGI 앱 실행 시작")
+    uvicorn.run("asgi:app", host="0.0.0.0", port=5000)
@@ -0,0 +1,94 @@
+# benchmarks/bench_face_roi.py
+#
+# 얼굴 ROI 모드 vs 전체 프레임 경로 비교 벤치마크
+# 사용법: python benchmarks/bench_face_roi.py test_images/sample1.jpg [--repeat 5]
+#
+# 입력 사진 주변에 여백을 붙여 얼굴/프레임 비율을 바꿔가며
+# 정렬 → 부위 크롭 → 일치율 → 결과 렌더링 시간을 측정하고,
+# 두 경로의 랜드마크·점수·결과 이미지 차이를 함께 출력합니다.
+
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analyzer.detect_face import detect_landmarks, align_and_detect_landmarks, align_and_detect_landmarks_roi
+from analyzer.image_devide import compare_match_parts_from_images, get_face_parts
+from analyzer.visualize_result import generate_result_image
+
+# 원본 대비 프레임 확장 배율 (1.0 = 원본 그대로)
+FRAME_SCALES = [1.0, 1.5, 2.0, 3.0, 4.0]
+
+def pad_frame(image_bgr: np.ndarray, frame_scale: float) -> bytes:
+    h, w = image_bgr.shape[:2]
+    pad_x = int(w * (frame_scale - 1) / 2)
+    pad_y = int(h * (frame_scale - 1) / 2)
+    padded = cv2.copyMakeBorder(image_bgr, pad_y, pad_y, pad_x, pad_x,
+                                cv2.BORDER_CONSTANT, value=(128, 128, 128))
+    ok, buf = cv2.imencode(".png", padded)
+    return buf.tobytes()
+
+def run_full(image_bytes, image, landmarks):
+    align_landmarks, align_image = align_and_detect_landmarks(image_bytes)
+    parts = get_face_parts(align_landmarks, align_image)
+    match_scores = compare_match_parts_from_images(parts)
+    result_image, _ = generate_result_image(image, landmarks, 80.0, {}, roi=False)
+    return align_landmarks, match_scores, result_image
+
+def run_roi(image_bytes, image, landmarks):
+    align_landmarks, align_image, roi = align_and_detect_landmarks_roi(image_bytes)
+    parts = get_face_parts(align_landmarks, align_image, roi.frame_size)
+    match_scores = compare_match_parts_from_images(parts)
+    result_image, _ = generate_result_image(image, landmarks, 80.0, {}, roi=True)
+    # 비교를 위해 프레임 좌표계로 환원
+    frame_landmarks = [(x + roi.left, y + roi.top) for x, y in align_landmarks]
+    return frame_landmarks, match_scores, result_image
+
+def best_of(fn, repeat, *args):
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, out
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("image")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    image_bgr = cv2.imread(args.image, cv2.IMREAD_COLOR)
+    if image_bgr is None:
+        sys.exit(f"이미지를 읽을 수 없음: {args.image}")
+
+    print(f"{'frame':>11} {'face%':>6} {'full ms':>8} {'roi ms':>8} {'speedup':>7} "
+          f"{'lm max px':>9} {'match max':>9} {'render max':>10}")
+    for frame_scale in FRAME_SCALES:
+        image_bytes = pad_frame(image_bgr, frame_scale)
+        landmarks, image = detect_landmarks(image_bytes)
+        if landmarks is None:
+            print(f"x{frame_scale}: 얼굴이 감지되지 않음")
+            continue
+
+        xs = [x for x, y in landmarks]
+        ys = [y for x, y in landmarks]
+        face_ratio = (max(xs) - min(xs)) * (max(ys) - min(ys)) / (image.width * image.height)
+
+        t_full, (lm_full, match_full, img_full) = best_of(run_full, args.repeat, image_bytes, image, landmarks)
+        t_roi, (lm_roi, match_roi, img_roi) = best_of(run_roi, args.repeat, image_bytes, image, landmarks)
+
+        lm_diff = max(abs(a - b) for p, q in zip(lm_full, lm_roi) for a, b in zip(p, q))
+        match_diff = max(abs((match_full[k] or 0) - (match_roi[k] or 0)) for k in match_full)
+        render_diff = int(np.abs(np.asarray(img_full, dtype=np.int16) - np.asarray(img_roi, dtype=np.int16)).max())
+
+        print(f"{image.width:>5}x{image.height:<5} {face_ratio:>6.1%} {t_full * 1000:>8.1f} {t_roi * 1000:>8.1f} "
+              f"{t_full / t_roi:>6.2f}x {lm_diff:>9} {match_diff:>9.2f} {render_diff:>10}")
+
+if __name__ == "__main__":
+    main()
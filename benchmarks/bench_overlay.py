@@ -0,0 +1,106 @@
+# benchmarks/bench_overlay.py
+#
+# OverlayRenderer vs 기존 PIL 개별 호출 비교 벤치마크
+# 사용법: python benchmarks/bench_overlay.py [--repeat 20]
+#
+# 478개 랜드마크(디버그 이미지)와 점선 10개 + 메시지 박스(결과 이미지)를
+# 프레임 크기별로 그려 소요 시간과 두 결과의 픽셀 차이 비율을 출력합니다.
+# MediaPipe 없이 동작하도록 랜드마크는 프레임 중앙에 무작위로 생성합니다.
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analyzer.visualize_result import draw_dotted_line
+from utils.overlay_utils import OverlayRenderer
+
+FRAME_SIZES = [(800, 1000), (1920, 1080), (3024, 4032)]
+NUM_LANDMARKS = 478
+
+# ── 기존 구현 (전체 프레임 오버레이 + 개별 ellipse / line 호출) ─────────────────
+def legacy_points(image, landmarks, color, radius):
+    if image.mode != "RGBA":
+        image = image.convert("RGBA")
+    overlay = Image.new("RGBA", image.size, (0, 0, 0, 0))
+    draw = ImageDraw.Draw(overlay)
+    for x, y in landmarks:
+        draw.ellipse([(x - radius, y - radius), (x + radius, y + radius)], fill=color)
+    return Image.alpha_composite(image, overlay)
+
+def legacy_debug(image, landmarks):
+    out = legacy_points(image, landmarks, "lime", 2)
+    return legacy_points(out, [landmarks[234], landmarks[454]], "red", 6)
+
+def legacy_result(image, segments, box):
+    image = image.convert("RGBA")
+    overlay = Image.new("RGBA", image.size, (0, 0, 0, 0))
+    ImageDraw.Draw(overlay).rectangle(box, fill=(0, 0, 0, 180))
+    image = Image.alpha_composite(image, overlay)
+    draw = ImageDraw.Draw(image)
+    for start, end, color in segments:
+        draw_dotted_line(draw, start, end, color=color)
+    return image
+
+# ── OverlayRenderer 구현 ────────────────────────────────────────────────────
+def renderer_debug(image, landmarks):
+    renderer = OverlayRenderer(image.size)
+    renderer.points(landmarks, color="lime", radius=2)
+    renderer.points([landmarks[234], landmarks[454]], color="red", radius=6)
+    return renderer.composite(image)
+
+def renderer_result(image, segments, box):
+    image = image.convert("RGBA")
+    renderer = OverlayRenderer(image.size)
+    renderer.rectangle(box, fill=(0, 0, 0, 180))
+    image = renderer.composite(image, inplace=True)
+    # 불투명 점선은 generate_result_image 처럼 이미지에 바로 그림
+    draw = ImageDraw.Draw(image)
+    for start, end, color in segments:
+        draw_dotted_line(draw, start, end, color=color)
+    return image
+
+def best_of(fn, repeat, *args):
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, out
+
+def diff_ratio(a, b):
+    a, b = np.asarray(a), np.asarray(b)
+    return float((a != b).any(axis=-1).mean())
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'frame':>11} {'case':>6} {'PIL ms':>8} {'new ms':>8} {'speedup':>7} {'diff px':>8}")
+    for w, h in FRAME_SIZES:
+        image = Image.fromarray(rng.integers(0, 256, (h, w, 3), dtype=np.uint8))
+        cx, cy, r = w / 2, h / 2, min(w, h) / 4
+        landmarks = [(int(x), int(y)) for x, y in
+                     rng.uniform((cx - r, cy - r), (cx + r, cy + r), (NUM_LANDMARKS, 2))]
+        segments = [(landmarks[i], (cx, landmarks[i][1]), c)
+                    for i, c in zip(range(0, 20, 2), ["blue", "cyan", "red"] * 4)]
+        box = (20, 20, w - 20, 20 + h // 6)
+
+        for case, legacy, new, extra in [
+            ("debug", legacy_debug, renderer_debug, (landmarks,)),
+            ("result", legacy_result, renderer_result, (segments, box)),
+        ]:
+            t_old, out_old = best_of(legacy, args.repeat, image, *extra)
+            t_new, out_new = best_of(new, args.repeat, image, *extra)
+            print(f"{w:>5}x{h:<5} {case:>6} {t_old * 1000:>8.2f} {t_new * 1000:>8.2f} "
+                  f"{t_old / t_new:>6.2f}x {diff_ratio(out_old, out_new):>8.2%}")
+
+if __name__ == "__main__":
+    main()
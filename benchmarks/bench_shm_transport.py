@@ -0,0 +1,86 @@
+# benchmarks/bench_shm_transport.py
+#
+# 공유 메모리 슬롯 전송 vs 피클 전송 비교 벤치마크
+# 사용법: python benchmarks/bench_shm_transport.py [--repeat 20]
+#
+# 디코딩된 프레임 크기의 uint8 배열을 워커 프로세스로 보내고, 워커가 같은 크기의
+# 결과 배열(좌우 반전)을 돌려주는 왕복 시간을 측정합니다.
+# - pickle: 배열 자체를 큐로 주고받음
+# - shm:    요청 쪽이 입력 슬롯에 한 번 기록, 워커는 뷰로 읽고 출력 슬롯에 직접 기록,
+#           큐에는 디스크립터만 오감
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.shm_transport import ShmArray, ShmRing, attach_view, write_array
+
+FRAME_SHAPES = [(480, 640, 3), (1080, 1920, 3), (3024, 4032, 3)]
+
+def worker_pickle(frame: np.ndarray) -> np.ndarray:
+    return np.ascontiguousarray(frame[:, ::-1])
+
+def worker_shm(in_desc: ShmArray, out_slot) -> ShmArray:
+    frame = attach_view(in_desc)
+    out_desc = ShmArray(out_slot, in_desc.shape, in_desc.dtype)
+    np.copyto(attach_view(out_desc), frame[:, ::-1])
+    return out_desc
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    max_bytes = max(int(np.prod(shape)) for shape in FRAME_SHAPES)
+    ring = ShmRing(slot_count=2, slot_bytes=max_bytes)
+    pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+    pool.submit(os.getpid).result()
+
+    rng = np.random.default_rng(0)
+    print(f"{'frame':>15} {'MB':>6} {'pickle ms':>10} {'shm ms':>8} {'speedup':>7}")
+    try:
+        for shape in FRAME_SHAPES:
+            frame = rng.integers(0, 256, shape, dtype=np.uint8)
+            expected = frame[:, ::-1]
+
+            def via_pickle():
+                out = pool.submit(worker_pickle, frame).result()
+                assert np.array_equal(out[:1], expected[:1])
+
+            def via_shm():
+                in_slot, out_slot = ring.acquire(), ring.acquire()
+                try:
+                    in_desc = write_array(in_slot, frame)
+                    out_desc = pool.submit(worker_shm, in_desc, out_slot).result()
+                    out = ring.view(out_desc)
+                    assert np.array_equal(out[:1], expected[:1])
+                    del out
+                finally:
+                    ring.release(in_slot)
+                    ring.release(out_slot)
+
+            t_pickle = best_of(via_pickle, args.repeat)
+            t_shm = best_of(via_shm, args.repeat)
+            print(f"{'x'.join(map(str, shape)):>15} {frame.nbytes / 1e6:>6.1f} {t_pickle * 1000:>10.2f} "
+                  f"{t_shm * 1000:>8.2f} {t_pickle / t_shm:>6.2f}x")
+    finally:
+        pool.shutdown()
+        ring.close()
+
+if __name__ == "__main__":
+    main()
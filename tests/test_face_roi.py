@@ -0,0 +1,116 @@
+# tests/test_face_roi.py
+#
+# 얼굴 ROI 경로가 전체 프레임 경로와 같은 결과를 내는지 확인하는 회귀 테스트.
+# 실행: python -m unittest discover -s tests -t .
+
+import unittest
+from contextlib import contextmanager
+from types import SimpleNamespace
+from unittest import mock
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from analyzer import detect_face, service
+from analyzer.image_devide import get_face_part_boxes, get_face_parts
+from analyzer.visualize_result import crop_to_face_center_with_zoom
+from utils.face_utils import get_face_roi
+
+FRAME_SIZE = (1600, 1200)
+FACE_BOX = (700, 500, 900, 760)  # 프레임 대비 작은 얼굴
+
+def make_frame(seed: int = 0) -> Image.Image:
+    rng = np.random.default_rng(seed)
+    w, h = FRAME_SIZE
+    return Image.fromarray(rng.integers(0, 256, (h, w, 3), dtype=np.uint8))
+
+def make_landmarks(seed: int = 0) -> list[tuple[int, int]]:
+    rng = np.random.default_rng(seed)
+    x0, y0, x1, y1 = FACE_BOX
+    xs = rng.integers(x0 + 20, x1 - 20, 478)
+    ys = rng.integers(y0 + 20, y1 - 20, 478)
+    landmarks = [(int(x), int(y)) for x, y in zip(xs, ys)]
+    cx, cy = (x0 + x1) // 2, (y0 + y1) // 2
+    # 귀끝(234, 454), 이마(10), 턱(152) 은 얼굴 외곽에 고정
+    landmarks[234], landmarks[454] = (x0, cy), (x1, cy)
+    landmarks[10], landmarks[152] = (cx, y0), (cx, y1)
+    return landmarks
+
+class FaceROITest(unittest.TestCase):
+
+    def test_part_crops_match_full_frame(self):
+        image = make_frame()
+        landmarks = make_landmarks()
+        roi = get_face_roi(landmarks, image.size, boxes=get_face_part_boxes(landmarks, image.size).values())
+        self.assertLess(roi.size[0] * roi.size[1], image.width * image.height)
+
+        # 2차 검출 랜드마크가 1차와 몇 픽셀 어긋나도 같은 크롭이 나와야 함
+        rng = np.random.default_rng(1)
+        for shift in (0, 3):
+            drifted = [(x + int(dx), y + int(dy)) for (x, y), (dx, dy)
+                       in zip(landmarks, rng.integers(-shift, shift + 1, (len(landmarks), 2)))]
+            local = [(x - roi.left, y - roi.top) for x, y in drifted]
+            roi_image = image.crop((roi.left, roi.top, roi.right, roi.bottom))
+
+            full_parts = get_face_parts(drifted, image)
+            roi_parts = get_face_parts(local, roi_image, roi.frame_size)
+            for name, part in full_parts.items():
+                with self.subTest(part=name, shift=shift):
+                    self.assertEqual(part.size, roi_parts[name].size)
+                    np.testing.assert_array_equal(np.asarray(part), np.asarray(roi_parts[name]))
+
+    def test_zoom_crop_matches_full_frame(self):
+        image = make_frame()
+        landmarks = make_landmarks()
+
+        full, full_landmarks = crop_to_face_center_with_zoom(image, landmarks, v_ratio=6/9,
+                                                             min_face_occupancy=0.5, roi=False)
+        boxed, boxed_landmarks = crop_to_face_center_with_zoom(image, landmarks, v_ratio=6/9,
+                                                               min_face_occupancy=0.5, roi=True)
+        self.assertEqual(full.size, boxed.size)
+        np.testing.assert_array_equal(np.asarray(full), np.asarray(boxed))
+        self.assertEqual(full_landmarks, boxed_landmarks)
+
+class FullFrameOnlyFaceMesh:
+    """전체 프레임에서만 얼굴을 찾고, 잘라낸 ROI 에서는 재검출에 실패하는 가짜 FaceMesh."""
+
+    def __init__(self, frame_shape):
+        self.frame_shape = frame_shape
+        w, h = FRAME_SIZE
+        self.face = SimpleNamespace(landmark=[SimpleNamespace(x=x / w, y=y / h) for x, y in make_landmarks()])
+        self.calls = []
+
+    def process(self, image):
+        found = image.shape[:2] == self.frame_shape
+        self.calls.append((image.shape[:2], found))
+        return SimpleNamespace(multi_face_landmarks=[self.face] if found else None)
+
+class RoiFallbackTest(unittest.TestCase):
+
+    def test_falls_back_to_full_frame_when_roi_second_pass_fails(self):
+        frame = np.asarray(make_frame())
+        ok, encoded = cv2.imencode(".png", frame)
+        self.assertTrue(ok)
+        face_mesh = FullFrameOnlyFaceMesh(frame.shape[:2])
+
+        @contextmanager
+        def fake_session():
+            yield face_mesh
+
+        with mock.patch.object(detect_face, "face_mesh_session", fake_session), \
+             mock.patch.object(service, "FACE_ROI_MODE", True), \
+             mock.patch.object(service, "analyze_aligned_face", return_value={}) as analyze:
+            body, status = service.analyze_image(encoded.tobytes(), tier=0)
+
+        self.assertEqual(status, 200, body)
+        # 1차 검출 → ROI 1차(성공)·2차(ROI 재검출 실패) → 전체 프레임 1차·2차
+        self.assertEqual([found for _, found in face_mesh.calls], [True, True, False, True, True])
+        _, kwargs = analyze.call_args
+        align_landmarks, align_image = analyze.call_args[0][2:4]
+        self.assertIsNone(kwargs["frame_size"])
+        self.assertEqual(align_image.size, FRAME_SIZE)
+        self.assertEqual(len(align_landmarks), 478)
+
+if __name__ == "__main__":
+    unittest.main()
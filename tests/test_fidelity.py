@@ -0,0 +1,114 @@
+# tests/test_fidelity.py
+#
+# TierSelector 큐 깊이·지연 예산 단계 선택, 단계 상한, in_flight 복구, snapshot 집계 테스트.
+# 실행: python -m unittest discover -s tests -t .
+
+import importlib
+import os
+import unittest
+from unittest import mock
+
+from analyzer import fidelity
+from analyzer.fidelity import TIERS, TierSelector
+
+def reload_with_env(**env):
+    with mock.patch.dict(os.environ, env):
+        return importlib.reload(fidelity)
+
+class QueueThresholdEnvTest(unittest.TestCase):
+
+    def tearDown(self):
+        # 다른 테스트가 기본 설정을 보도록 원래 환경으로 다시 로드
+        importlib.reload(fidelity)
+
+    def test_parses_thresholds(self):
+        module = reload_with_env(FIDELITY_QUEUE_THRESHOLDS="4, 10,20")
+        self.assertEqual(module.FIDELITY_QUEUE_THRESHOLDS, [4, 10, 20])
+        self.assertEqual(module.TierSelector().queue_thresholds, [4, 10, 20])
+
+    def test_empty_value_disables_queue_tiers(self):
+        module = reload_with_env(FIDELITY_QUEUE_THRESHOLDS="")
+        self.assertEqual(module.FIDELITY_QUEUE_THRESHOLDS, [])
+
+        selector = module.TierSelector(latency_budget_ms=0)
+        selector.in_flight = 1000
+        self.assertEqual(selector._pick(), 0)
+
+class TierSelectorTest(unittest.TestCase):
+
+    def test_queue_thresholds(self):
+        selector = TierSelector(queue_thresholds=[2, 4, 6], latency_budget_ms=0)
+        expected = {0: 0, 1: 0, 2: 1, 3: 1, 4: 2, 5: 2, 6: 3, 7: 3}
+        for in_flight, tier in expected.items():
+            selector.in_flight = in_flight
+            self.assertEqual(selector._pick(), tier, f"in_flight={in_flight}")
+
+    def test_latency_budget_multiples(self):
+        selector = TierSelector(queue_thresholds=[], latency_budget_ms=100)
+        for ewma, tier in [(0, 0), (99, 0), (100, 1), (199, 1), (200, 2), (299, 2), (300, 3)]:
+            selector.latency_ewma_ms = ewma
+            self.assertEqual(selector._pick(), tier, f"ewma={ewma}")
+
+    def test_latency_ewma(self):
+        selector = TierSelector(queue_thresholds=[], latency_budget_ms=100)
+        selector.enter()
+        selector.exit(250)  # 첫 측정값은 그대로 EWMA 가 됨
+        self.assertEqual(selector.latency_ewma_ms, 250)
+
+        selector.enter()
+        selector.exit(0)
+        self.assertAlmostEqual(selector.latency_ewma_ms, 250 * (1 - fidelity.LATENCY_EWMA_ALPHA))
+        self.assertEqual(selector.enter(), 2)
+
+    def test_capped_at_last_tier(self):
+        selector = TierSelector(queue_thresholds=[1, 2, 3, 4, 5], latency_budget_ms=10)
+        selector.in_flight = 100
+        self.assertEqual(selector._pick(), len(TIERS) - 1)
+
+        selector.in_flight = 0
+        selector.latency_ewma_ms = 10_000
+        self.assertEqual(selector._pick(), len(TIERS) - 1)
+
+    def test_uses_higher_of_queue_and_latency(self):
+        selector = TierSelector(queue_thresholds=[2, 4, 6], latency_budget_ms=100)
+        selector.in_flight = 2
+        selector.latency_ewma_ms = 250
+        self.assertEqual(selector._pick(), 2)
+
+        selector.in_flight = 6
+        self.assertEqual(selector._pick(), 3)
+
+    def test_track_restores_in_flight_on_exception(self):
+        selector = TierSelector(queue_thresholds=[1], latency_budget_ms=0)
+        with self.assertRaises(RuntimeError):
+            with selector.track() as tier:
+                self.assertEqual(tier, 0)
+                self.assertEqual(selector.in_flight, 1)
+                raise RuntimeError("boom")
+
+        self.assertEqual(selector.in_flight, 0)
+        self.assertGreater(selector.latency_ewma_ms, 0)
+        # 실패한 요청이 남긴 in_flight 때문에 단계가 내려가지 않음
+        with selector.track() as tier:
+            self.assertEqual(tier, 0)
+
+    def test_snapshot_counts(self):
+        selector = TierSelector(queue_thresholds=[1, 2], latency_budget_ms=0)
+        with selector.track():
+            with selector.track():
+                with selector.track():
+                    snapshot = selector.snapshot()
+                    self.assertEqual(snapshot["in_flight"], 3)
+
+        snapshot = selector.snapshot()
+        self.assertEqual(snapshot["in_flight"], 0)
+        self.assertEqual(snapshot["tier_counts"],
+                         {"full": 1, "single_pass": 1, "proxy": 1, "scores_only": 0})
+        self.assertEqual(set(snapshot), {"in_flight", "latency_ewma_ms", "tier_counts"})
+
+        # 복사본을 반환하므로 바깥에서 바꿔도 집계에 영향 없음
+        snapshot["tier_counts"]["full"] = 99
+        self.assertEqual(selector.snapshot()["tier_counts"]["full"], 1)
+
+if __name__ == "__main__":
+    unittest.main()
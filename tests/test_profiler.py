@@ -0,0 +1,181 @@
+# tests/test_profiler.py
+#
+# 프로파일 창 회전·직전 창 대체, Stats/dict 합산, pstats·collapsed 내보내기,
+# 스테이지 스레드 프로파일 수집, 프로파일 토큰 검사 테스트.
+# 실행: python -m unittest discover -s tests -t .
+
+import cProfile
+import os
+import pstats
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest import mock
+
+from utils import profiler
+from utils.profiler import ProfileWindow, has_profile_token, profiling, should_profile
+from utils.stage_scheduler import StageScheduler
+
+def busy_work(n=2000):
+    return sum(i * i for i in range(n))
+
+def stage_only_work(n=2000):
+    return sum(i * i for i in range(n))
+
+def profiled_stats(fn) -> pstats.Stats:
+    profile = cProfile.Profile()
+    profile.enable()
+    fn()
+    profile.disable()
+    return pstats.Stats(profile)
+
+def call_count(stats: pstats.Stats | dict, name: str) -> int:
+    raw = stats.stats if isinstance(stats, pstats.Stats) else stats
+    return sum(value[1] for func, value in raw.items() if func[2] == name)
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+class ProfileWindowTest(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch.object(profiler, "time", SimpleNamespace(time=self.clock.time))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.window = ProfileWindow(window_sec=10)
+
+    def test_add_accepts_stats_and_worker_dict(self):
+        stats = profiled_stats(busy_work)
+        self.window.add(stats)
+        self.window.add(dict(profiled_stats(busy_work).stats))  # 워커에서 넘어온 Stats.stats
+        self.window.add(None)
+
+        self.assertEqual(self.window.info()["samples"], 2)
+        exported, samples = self.window._export_stats()
+        self.assertEqual(samples, 2)
+        self.assertEqual(call_count(exported, "busy_work"), 2)
+
+    def test_rotation_falls_back_to_previous_window(self):
+        self.window.add(profiled_stats(busy_work))
+
+        # 창이 지나면 빈 새 창이 시작되고, 내보내기는 직전 창 기준
+        self.clock.now += 10
+        exported, samples = self.window._export_stats()
+        self.assertEqual(samples, 1)
+        self.assertEqual(call_count(exported, "busy_work"), 1)
+        info = self.window.info()
+        self.assertEqual((info["samples"], info["previous_samples"]), (0, 1))
+        self.assertEqual(info["window_started"], self.clock.now)
+
+        # 새 창에 샘플이 생기면 현재 창 기준
+        self.window.add(profiled_stats(stage_only_work))
+        exported, samples = self.window._export_stats()
+        self.assertEqual(samples, 1)
+        self.assertEqual(call_count(exported, "busy_work"), 0)
+        self.assertEqual(call_count(exported, "stage_only_work"), 1)
+
+    def test_no_rotation_within_window(self):
+        self.window.add(profiled_stats(busy_work))
+        self.clock.now += 9.9
+        self.window.add(profiled_stats(busy_work))
+        info = self.window.info()
+        self.assertEqual((info["samples"], info["previous_samples"]), (2, 0))
+
+    def test_export_pstats_reloads(self):
+        self.window.add(profiled_stats(busy_work))
+        data = self.window.export_pstats()
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "analyze.prof")
+            with open(path, "wb") as f:
+                f.write(data)
+            loaded = pstats.Stats(path)
+
+        self.assertEqual(call_count(loaded, "busy_work"), 1)
+        self.assertGreater(loaded.total_tt, 0)
+
+    def test_export_collapsed_format(self):
+        main = ("/srv/app.py", 10, "main")
+        work = ("/srv/lib.py", 5, "work")
+        sort = ("~", 0, "<method 'sort' of 'list' objects>")
+        tiny = ("/srv/lib.py", 20, "tiny")
+        self.window.add({
+            main: (1, 1, 0.001, 0.004, {}),
+            work: (2, 2, 0.002, 0.003, {main: (2, 2, 0.002, 0.003)}),
+            sort: (1, 1, 0.001, 0.001, {work: (1, 1, 0.001, 0.001)}),
+            tiny: (1, 1, 1e-6, 1e-6, {main: (1, 1, 1e-6, 1e-6)}),  # min_seconds 미만 가지는 생략
+        })
+
+        collapsed = self.window.export_collapsed()
+        self.assertTrue(collapsed.endswith("\n"))
+        lines = {}
+        for line in collapsed.splitlines():
+            stack, micros = line.rsplit(" ", 1)
+            lines[stack] = int(micros)
+
+        self.assertEqual(set(lines), {
+            "main (app.py:10)",
+            "main (app.py:10);work (lib.py:5)",
+            "main (app.py:10);work (lib.py:5);<method 'sort' of 'list' objects>",
+        })
+        self.assertAlmostEqual(lines["main (app.py:10)"], 1000, delta=1)
+        self.assertAlmostEqual(lines["main (app.py:10);work (lib.py:5)"], 2000, delta=1)
+        self.assertAlmostEqual(lines["main (app.py:10);work (lib.py:5);<method 'sort' of 'list' objects>"],
+                               1000, delta=1)
+
+    def test_export_empty_window(self):
+        self.assertEqual(self.window.export_collapsed(), "\n")
+        self.assertEqual(self.window.info()["samples"], 0)
+
+class ProfilingSessionTest(unittest.TestCase):
+
+    def test_disabled_yields_none(self):
+        with profiling(False) as session:
+            self.assertIsNone(session)
+            self.assertIsNone(profiler.current_session())
+
+    def test_collects_stage_thread_profiles(self):
+        executor = ThreadPoolExecutor(max_workers=2)
+        self.addCleanup(executor.shutdown, wait=True)
+
+        with profiling(True) as session:
+            self.assertIs(profiler.current_session(), session)
+            scheduler = StageScheduler(max_parallel=2, executor=executor)
+            scheduler.add("a", stage_only_work)
+            scheduler.add("b", stage_only_work)
+            scheduler.add("c", lambda a, b: a + b, deps=("a", "b"))
+            results = scheduler.run()
+
+        self.assertIsNone(profiler.current_session())
+        self.assertEqual(results["c"], 2 * stage_only_work())
+        # 요청 스레드 1개 + 스테이지 스레드 3개
+        self.assertEqual(len(session.profiles), 4)
+        self.assertEqual(call_count(session.stats(), "stage_only_work"), 2)
+
+class ProfileTokenTest(unittest.TestCase):
+
+    def test_unset_token_never_matches(self):
+        with mock.patch.object(profiler, "PROFILE_HEADER_TOKEN", ""), \
+             mock.patch.object(profiler, "PROFILE_SAMPLE_RATE", 0.0):
+            self.assertFalse(has_profile_token(None))
+            self.assertFalse(has_profile_token(""))
+            self.assertFalse(has_profile_token("anything"))
+            self.assertFalse(should_profile("anything"))
+
+    def test_token_must_match(self):
+        with mock.patch.object(profiler, "PROFILE_HEADER_TOKEN", "secret"), \
+             mock.patch.object(profiler, "PROFILE_SAMPLE_RATE", 0.0):
+            self.assertTrue(has_profile_token("secret"))
+            self.assertFalse(has_profile_token("wrong"))
+            self.assertFalse(has_profile_token(None))
+            self.assertTrue(should_profile("secret"))
+            self.assertFalse(should_profile("wrong"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+# tests/test_shm_transport.py
+#
+# 공유 메모리 슬롯 링: 슬롯 부족 시 피클 전송 대체, 워커 실패/취소 후 슬롯 반납,
+# close() 시 세그먼트 unlink, /dev/shm 용량 초과 시 생성 단계 실패, 워커 프로세스와의 업로드/응답 전달 테스트.
+# 실행: python -m unittest discover -s tests -t .
+
+import multiprocessing
+import os
+import time
+import unittest
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+
+from utils.shm_transport import ShmRing, attach_view, fit_slot_count, shm_free_bytes, write_bytes
+
+SLOT_COUNT = 4
+SLOT_BYTES = 1024
+
+# ── 워커 프로세스에서 실행되는 함수 (asgi → service.handle_request 와 같은 전달 방식) ──
+def _echo_reversed(desc, out_slot):
+    data = attach_view(desc).tobytes()
+    return write_bytes(out_slot, data[::-1])
+
+def _crash(desc, out_slot):
+    attach_view(desc)
+    os._exit(1)
+
+def wait_until(predicate, timeout: float = 5.0) -> bool:
+    # Future 콜백은 result() 대기자가 깨어난 뒤 실행될 수 있으므로 잠시 기다림
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+class ShmRingTest(unittest.TestCase):
+
+    def setUp(self):
+        self.ring = ShmRing(SLOT_COUNT, SLOT_BYTES)
+
+    def tearDown(self):
+        self.ring.close()
+
+    def test_slots_reused_lifo(self):
+        first = self.ring.acquire()
+        second = self.ring.acquire()
+        self.ring.release(second)
+        self.ring.release(first)
+        self.assertEqual(self.ring.acquire().index, first.index)
+        self.assertEqual(self.ring.acquire().index, second.index)
+
+    def test_exhaustion_falls_back_to_pickle(self):
+        pairs = [self.ring.acquire_pair(16) for _ in range(SLOT_COUNT // 2)]
+        self.assertTrue(all(in_slot and out_slot for in_slot, out_slot in pairs))
+        self.assertEqual(self.ring.acquire_pair(16), (None, None))
+
+        # 한 쌍에 모자라는 슬롯 하나는 꺼냈다가 다시 돌려놓아야 함
+        self.ring.release(pairs[0][0])
+        self.assertEqual(self.ring.acquire_pair(16), (None, None))
+        self.assertEqual(self.ring.free_count(), 1)
+
+    def test_oversized_upload_falls_back_to_pickle(self):
+        self.assertEqual(self.ring.acquire_pair(SLOT_BYTES + 1), (None, None))
+        self.assertEqual(self.ring.free_count(), SLOT_COUNT)
+
+    def test_release_waits_for_future(self):
+        in_slot, out_slot = self.ring.acquire_pair(16)
+        future = Future()
+        self.ring.release_when_done(future, in_slot, out_slot)
+        self.assertEqual(self.ring.free_count(), SLOT_COUNT - 2)
+
+        future.set_exception(RuntimeError("worker failed"))
+        self.assertEqual(self.ring.free_count(), SLOT_COUNT)
+
+    def test_release_after_cancel(self):
+        in_slot, out_slot = self.ring.acquire_pair(16)
+        future = Future()
+        self.ring.release_when_done(future, in_slot, out_slot)
+        self.assertTrue(future.cancel())
+        self.assertEqual(self.ring.free_count(), SLOT_COUNT)
+
+    def test_release_without_future(self):
+        in_slot, out_slot = self.ring.acquire_pair(16)
+        self.ring.release_when_done(None, in_slot, out_slot)
+        self.assertEqual(self.ring.free_count(), SLOT_COUNT)
+
+    def test_close_unlinks_segment(self):
+        ring = ShmRing(2, SLOT_BYTES)
+        name = ring.name
+        ring.close()
+        ring.close()  # 두 번 닫아도 안전
+        with self.assertRaises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+
+    def test_oversized_ring_fails_at_creation(self):
+        free = shm_free_bytes()
+        if free is None or not hasattr(os, "posix_fallocate"):
+            self.skipTest("posix_fallocate / statvfs 를 쓸 수 없는 플랫폼")
+        before = set(os.listdir("/dev/shm"))
+        with self.assertRaises(OSError):
+            ShmRing(1, free + 1024 * 1024)
+        self.assertEqual(set(os.listdir("/dev/shm")), before)
+
+    def test_fit_slot_count_respects_free_space(self):
+        free = shm_free_bytes()
+        if free is None:
+            self.skipTest("/dev/shm 여유 공간을 알 수 없는 플랫폼")
+        slot_bytes = 1024 * 1024
+        self.assertLessEqual(fit_slot_count(10 ** 9, slot_bytes) * slot_bytes, free)
+        self.assertEqual(fit_slot_count(1, 1), 1)
+
+class WorkerHandoffTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # asgi 와 같이 링을 워커보다 먼저 만들어 resource_tracker 를 공유
+        cls.ring = ShmRing(SLOT_COUNT, SLOT_BYTES)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.ring.close()
+
+    def make_pool(self) -> ProcessPoolExecutor:
+        pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+        self.addCleanup(pool.shutdown, wait=True, cancel_futures=True)
+        return pool
+
+    def test_upload_and_response_round_trip(self):
+        in_slot, out_slot = self.ring.acquire_pair(5)
+        future = self.make_pool().submit(_echo_reversed, write_bytes(in_slot, b"hello"), out_slot)
+        self.ring.release_when_done(future, in_slot, out_slot)
+
+        body_desc = future.result(timeout=60)
+        self.assertEqual(self.ring.view(body_desc).tobytes(), b"olleh")
+        self.assertTrue(wait_until(lambda: self.ring.free_count() == SLOT_COUNT))
+
+    def test_slots_released_after_worker_crash(self):
+        in_slot, out_slot = self.ring.acquire_pair(5)
+        future = self.make_pool().submit(_crash, write_bytes(in_slot, b"hello"), out_slot)
+        self.ring.release_when_done(future, in_slot, out_slot)
+
+        with self.assertRaises(BrokenProcessPool):
+            future.result(timeout=60)
+        self.assertTrue(wait_until(lambda: self.ring.free_count() == SLOT_COUNT))
+
+        # 죽은 워커가 세그먼트를 지우지 않았는지 확인
+        shm = shared_memory.SharedMemory(name=self.ring.name)
+        shm.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+# tests/test_stage_scheduler.py
+#
+# StageScheduler 의존성 순서, 병렬도 상한, 예외 전파/취소, 임계 경로 테스트.
+# 실행: python -m unittest discover -s tests -t .
+
+import threading
+import time
+import unittest
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from utils.stage_scheduler import StageScheduler
+
+class QueueingExecutor:
+    """첫 작업만 제출 즉시 실행하고 나머지는 시작하지 않은 채 대기시키는 테스트용 실행기."""
+
+    def __init__(self):
+        self.started = False
+        self.queued = []
+
+    def submit(self, fn, *args):
+        future = Future()
+        if self.started:
+            self.queued.append(future)
+            return future
+        self.started = True
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+class StageSchedulerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.executor = ThreadPoolExecutor(max_workers=8)
+
+    def tearDown(self):
+        self.executor.shutdown(wait=True)
+
+    def test_add_validates_dependencies(self):
+        scheduler = StageScheduler()
+        scheduler.add("a", lambda: 1)
+        with self.assertRaises(ValueError):
+            scheduler.add("a", lambda: 2)
+        with self.assertRaises(ValueError):
+            scheduler.add("b", lambda x: x, deps=("missing",))
+
+    def test_serial_runs_inline_in_registration_order(self):
+        order = []
+        scheduler = StageScheduler(max_parallel=1, executor=self.executor)
+        scheduler.add("a", lambda: order.append(("a", threading.get_ident())) or 2)
+        scheduler.add("b", lambda a: order.append(("b", threading.get_ident())) or a * 3, deps=("a",))
+        scheduler.add("c", lambda a, b: a + b, deps=("a", "b"))
+
+        results = scheduler.run()
+        self.assertEqual(results, {"a": 2, "b": 6, "c": 8})
+        self.assertEqual([name for name, _ in order], ["a", "b"])
+        self.assertTrue(all(ident == threading.get_ident() for _, ident in order))
+
+    def test_parallel_respects_dependencies(self):
+        spans = {}
+
+        def stage(name, value):
+            def fn(*deps):
+                start = time.perf_counter()
+                time.sleep(0.01)
+                spans[name] = (start, time.perf_counter())
+                return value + sum(deps)
+            return fn
+
+        scheduler = StageScheduler(max_parallel=4, executor=self.executor)
+        scheduler.add("a", stage("a", 1))
+        scheduler.add("b", stage("b", 10), deps=("a",))
+        scheduler.add("c", stage("c", 100), deps=("a",))
+        scheduler.add("d", stage("d", 1000), deps=("b", "c"))
+
+        results = scheduler.run()
+        self.assertEqual(results["d"], 1000 + 11 + 101)
+        for child, parent in (("b", "a"), ("c", "a"), ("d", "b"), ("d", "c")):
+            self.assertGreaterEqual(spans[child][0], spans[parent][1], f"{child} started before {parent} ended")
+
+    def test_parallel_cap(self):
+        lock = threading.Lock()
+        active = peak = 0
+        # 두 스테이지가 실제로 동시에 돌아야 통과 (상한이 1로 떨어지면 타임아웃)
+        barrier = threading.Barrier(2)
+
+        def fn():
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            barrier.wait(timeout=5)
+            time.sleep(0.01)
+            with lock:
+                active -= 1
+
+        scheduler = StageScheduler(max_parallel=2, executor=self.executor)
+        for i in range(6):
+            scheduler.add(f"s{i}", fn)
+        scheduler.run()
+        self.assertEqual(peak, 2)
+
+    def test_exception_propagates_and_skips_dependents(self):
+        ran = []
+
+        def fail():
+            raise KeyError("boom")
+
+        scheduler = StageScheduler(max_parallel=4, executor=self.executor)
+        scheduler.add("fail", fail)
+        scheduler.add("child", lambda _: ran.append("child"), deps=("fail",))
+        with self.assertRaises(KeyError):
+            scheduler.run()
+        self.assertEqual(ran, [])
+
+    def test_exception_cancels_queued_stages(self):
+        ran = []
+        executor = QueueingExecutor()
+
+        def fail():
+            raise RuntimeError("boom")
+
+        scheduler = StageScheduler(max_parallel=3, executor=executor)
+        scheduler.add("fail", fail)
+        scheduler.add("queued_1", lambda: ran.append(1))
+        scheduler.add("queued_2", lambda: ran.append(2))
+        with self.assertRaises(RuntimeError):
+            scheduler.run()
+        self.assertEqual(ran, [])
+        self.assertEqual(len(executor.queued), 2)
+        self.assertTrue(all(future.cancelled() for future in executor.queued))
+
+    def test_critical_path_follows_slowest_chain(self):
+        scheduler = StageScheduler(max_parallel=4, executor=self.executor)
+        scheduler.add("load", lambda: time.sleep(0.01))
+        scheduler.add("slow", lambda _: time.sleep(0.08), deps=("load",))
+        scheduler.add("fast", lambda _: time.sleep(0.01), deps=("load",))
+        scheduler.add("merge", lambda *_: None, deps=("fast", "slow"))
+        scheduler.run()
+
+        path = scheduler.critical_path()
+        self.assertEqual([name for name, _ in path], ["load", "slow", "merge"])
+        self.assertGreaterEqual(path[1][1], 80 * 0.9)
+
+if __name__ == "__main__":
+    unittest.main()
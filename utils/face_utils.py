@@ -1,6 +1,33 @@
 # utils/face_utils.py
 
-from typing import List, Tuple
+import math
+from typing import Iterable, List, NamedTuple, Tuple
+
+# 얼굴 ROI 여백 비율 (랜드마크 외곽 박스 크기 기준)
+# FaceMesh 재검출에 필요한 얼굴 주변 여백과 2차 랜드마크 오차를 흡수할 만큼만 잡아
+# ROI 크기가 사진 해상도가 아닌 얼굴 크기를 따라가도록 합니다.
+ROI_PADDING_RATIO = 0.25
+
+class FaceROI(NamedTuple):
+    """
+    원본 프레임 안에서 얼굴 영역(ROI)의 위치 정보.
+    - left, top, right, bottom: 프레임 좌표계 기준 ROI 경계 (right, bottom 미포함)
+    - frame_w, frame_h: 원본 프레임 크기 (비율 기반 패딩 계산에 사용)
+    """
+    left: int
+    top: int
+    right: int
+    bottom: int
+    frame_w: int
+    frame_h: int
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        return (self.right - self.left, self.bottom - self.top)
+
+    @property
+    def frame_size(self) -> Tuple[int, int]:
+        return (self.frame_w, self.frame_h)
 
 def estimate_position(landmarks: List[Tuple[float, float]], indices: List[int]) -> Tuple[int, int]:
     """
@@ -14,3 +41,34 @@ def estimate_position(landmarks: List[Tuple[float, float]], indices: List[int])
     avg_x = sum(x for x, y in pts) // len(pts)
     avg_y = sum(y for x, y in pts) // len(pts)
     return (avg_x, avg_y)
+
+def get_face_roi(
+    landmarks: List[Tuple[float, float]],
+    frame_size: Tuple[int, int],
+    boxes: Iterable[Tuple[float, float, float, float]] = (),
+    pad_ratio: float = ROI_PADDING_RATIO
+) -> FaceROI:
+    """
+    랜드마크 외곽 박스(와 반드시 포함해야 할 boxes)에 얼굴 크기 비율만큼 여백을 더한 얼굴 ROI를 계산합니다.
+    - landmarks: (x, y) 튜플의 리스트 (프레임 좌표계)
+    - frame_size: (width, height) 원본 프레임 크기
+    - boxes: ROI 안에 들어가야 하는 (x0, y0, x1, y1) 박스들 (예: 부위 크롭 영역)
+    - pad_ratio: 랜드마크 외곽 박스 가로/세로 대비 여백 비율
+    """
+    w, h = frame_size
+    xs = [x for x, y in landmarks]
+    ys = [y for x, y in landmarks]
+    pad_x = math.ceil(pad_ratio * (max(xs) - min(xs)))
+    pad_y = math.ceil(pad_ratio * (max(ys) - min(ys)))
+
+    boxes = list(boxes)
+    x0 = min([min(xs)] + [b[0] for b in boxes])
+    y0 = min([min(ys)] + [b[1] for b in boxes])
+    x1 = max([max(xs)] + [b[2] for b in boxes])
+    y1 = max([max(ys)] + [b[3] for b in boxes])
+
+    left = max(int(math.floor(x0)) - pad_x, 0)
+    top = max(int(math.floor(y0)) - pad_y, 0)
+    right = min(int(math.ceil(x1)) + pad_x, w)
+    bottom = min(int(math.ceil(y1)) + pad_y, h)
+    return FaceROI(left, top, right, bottom, w, h)
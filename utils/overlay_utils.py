@@ -0,0 +1,197 @@
+# utils/overlay_utils.py
+
+import threading
+from typing import Iterable, List, Optional, Tuple
+
+import cv2
+import numpy as np
+from PIL import Image, ImageColor
+
+# 스레드별로 재사용하는 RGBA 오버레이 버퍼
+_local = threading.local()
+
+# 스레드별로 계속 들고 있을 버퍼 최대 픽셀 수 (약 8MB, 결과 이미지 800x1000 은 항상 캐시)
+# 이보다 큰 버퍼(큰 디버그 업로드 등)는 composite() 후 바로 해제합니다.
+BUFFER_CACHE_MAX_PIXELS = 2_000_000
+
+def _to_rgba(color) -> Tuple[int, int, int, int]:
+    """PIL 색상 표기('lime', '#ff0000', (r, g, b[, a]))를 RGBA 튜플로 변환합니다."""
+    if isinstance(color, str):
+        color = ImageColor.getrgb(color)
+    if len(color) == 3:
+        color = (*color, 255)
+    return tuple(int(c) for c in color)
+
+def _disc_offsets(radius: int) -> Tuple[np.ndarray, np.ndarray]:
+    """반지름 radius 원을 채우는 (dy, dx) 오프셋 (PIL ellipse 모양에 맞춤)."""
+    r = int(radius)
+    dy, dx = np.mgrid[-r:r + 1, -r:r + 1]
+    mask = dx * dx + dy * dy <= r * (r + 1)
+    return dy[mask], dx[mask]
+
+def _acquire_buffer(width: int, height: int) -> np.ndarray:
+    """현재 스레드의 오버레이 버퍼에서 (height, width, 4) 뷰를 꺼냅니다."""
+    buf = getattr(_local, "buffer", None)
+    # 모자라면 키우고, 요청 크기의 4배를 넘게 크면 줄여서 가로·세로가 따로 자라지 않게 함
+    if (buf is None or buf.shape[0] < height or buf.shape[1] < width
+            or buf.shape[0] * buf.shape[1] > 4 * max(width * height, 1)):
+        buf = np.zeros((max(height, 1), max(width, 1), 4), dtype=np.uint8)
+        _local.buffer = buf
+        _local.dirty = None
+
+    # 이전 렌더링이 예외로 중단되어 남은 영역 정리
+    dirty = getattr(_local, "dirty", None)
+    if dirty is not None:
+        x0, y0, x1, y1 = dirty
+        buf[y0:y1, x0:x1] = 0
+        _local.dirty = None
+
+    return buf[:height, :width]
+
+def _trim_buffer():
+    """캐시 상한을 넘는 현재 스레드의 버퍼를 놓아 줍니다 (사용 중인 렌더러의 뷰는 그대로 유효)."""
+    buf = getattr(_local, "buffer", None)
+    if buf is not None and buf.shape[0] * buf.shape[1] > BUFFER_CACHE_MAX_PIXELS:
+        _local.buffer = None
+        _local.dirty = None
+
+class OverlayRenderer:
+    """
+    점·점선·메쉬를 한 번에 그리는 오버레이 렌더러.
+
+    스레드별로 재사용되는 RGBA 버퍼 하나에 NumPy/OpenCV 일괄 연산으로 그린 뒤,
+    composite() 에서 실제로 그려진 영역(dirty region)만 원본 이미지에 합성합니다.
+    BUFFER_CACHE_MAX_PIXELS 를 넘는 큰 버퍼는 스레드에 남기지 않습니다.
+    버퍼를 공유하므로 한 스레드에서는 composite() 전까지 렌더러 하나만 사용합니다.
+
+    사용 예:
+        renderer = OverlayRenderer(image.size)
+        renderer.points(landmarks, color="lime", radius=2)
+        renderer.dashed_lines([(start, end)], color="blue", width=2)
+        image = renderer.composite(image)
+    """
+
+    def __init__(self, size: Tuple[int, int]):
+        self.width, self.height = size
+        self.buffer = _acquire_buffer(self.width, self.height)
+        self.dirty: Optional[List[int]] = None
+
+    # ── dirty region 관리 ────────────────────────────────────────────────────
+    def _mark(self, x0, y0, x1, y1):
+        x0 = max(int(np.floor(x0)), 0)
+        y0 = max(int(np.floor(y0)), 0)
+        x1 = min(int(np.ceil(x1)) + 1, self.width)
+        y1 = min(int(np.ceil(y1)) + 1, self.height)
+        if x0 >= x1 or y0 >= y1:
+            return
+        if self.dirty is None:
+            self.dirty = [x0, y0, x1, y1]
+        else:
+            d = self.dirty
+            self.dirty = [min(d[0], x0), min(d[1], y0), max(d[2], x1), max(d[3], y1)]
+        _local.dirty = tuple(self.dirty)
+
+    # ── 그리기 ──────────────────────────────────────────────────────────────
+    def points(self, points: Iterable[Tuple[float, float]], color="lime", radius: int = 3):
+        """각 좌표에 반지름 radius 의 채워진 원을 그립니다."""
+        pts = np.rint(np.asarray(list(points), dtype=np.float64).reshape(-1, 2)).astype(np.int64)
+        if len(pts) == 0:
+            return self
+
+        dy, dx = _disc_offsets(radius)
+        xs = (pts[:, 0:1] + dx[None, :]).ravel()
+        ys = (pts[:, 1:2] + dy[None, :]).ravel()
+        inside = (xs >= 0) & (xs < self.width) & (ys >= 0) & (ys < self.height)
+        xs, ys = xs[inside], ys[inside]
+        if len(xs) == 0:
+            return self
+
+        self.buffer[ys, xs] = _to_rgba(color)
+        self._mark(xs.min(), ys.min(), xs.max(), ys.max())
+        return self
+
+    def lines(self, segments: Iterable[Tuple[Tuple[float, float], Tuple[float, float]]],
+              color="white", width: int = 1):
+        """(start, end) 선분들을 cv2.polylines 한 번으로 그립니다."""
+        segs = np.rint(np.asarray(list(segments), dtype=np.float64).reshape(-1, 2, 2)).astype(np.int32)
+        if len(segs) == 0:
+            return self
+
+        cv2.polylines(self.buffer, list(segs), isClosed=False, color=_to_rgba(color),
+                      thickness=max(int(width), 1), lineType=cv2.LINE_8)
+        pad = width
+        self._mark(segs[:, :, 0].min() - pad, segs[:, :, 1].min() - pad,
+                   segs[:, :, 0].max() + pad, segs[:, :, 1].max() + pad)
+        return self
+
+    def dashed_lines(self, segments: Iterable[Tuple[Tuple[float, float], Tuple[float, float]]],
+                     color="blue", width: int = 2, dash_length: float = 10):
+        """
+        (start, end) 선분들을 점선으로 그립니다.
+        visualize_result.draw_dotted_line 과 같은 규칙으로 대시를 나눕니다.
+        """
+        segs = np.asarray(list(segments), dtype=np.float64).reshape(-1, 2, 2)
+        if len(segs) == 0:
+            return self
+
+        starts, ends = segs[:, 0], segs[:, 1]
+        delta = ends - starts
+        num = (np.hypot(delta[:, 0], delta[:, 1]) // dash_length).astype(np.int64)
+
+        # 대시 개수가 1 미만이면 실선 그대로
+        solid = segs[num < 1]
+
+        dashed = num >= 1
+        counts = (num[dashed] + 1) // 2  # range(0, num, 2) 개수
+        seg_idx = np.repeat(np.arange(int(dashed.sum())), counts)
+        offsets = np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+        step_i = (offsets * 2)[:, None]
+        step = (delta[dashed] / num[dashed][:, None])[seg_idx]
+        base = starts[dashed][seg_idx]
+        dashes = np.stack([base + step * step_i, base + step * (step_i + 1)], axis=1)
+
+        return self.lines(np.concatenate([solid, dashes]), color=color, width=width)
+
+    def mesh(self, landmarks: List[Tuple[float, float]], connections: Iterable[Tuple[int, int]],
+             color="white", width: int = 1):
+        """connections 의 (i, j) 인덱스 쌍마다 랜드마크를 잇는 메쉬를 그립니다."""
+        pts = np.asarray(landmarks, dtype=np.float64)
+        edges = np.asarray([(i, j) for i, j in connections if i < len(pts) and j < len(pts)], dtype=np.int64)
+        if len(edges) == 0:
+            return self
+        return self.lines(pts[edges], color=color, width=width)
+
+    def rectangle(self, box: Tuple[float, float, float, float], fill=(0, 0, 0, 180)):
+        """box = (x0, y0, x1, y1) 영역을 fill 색으로 채웁니다 (경계 포함)."""
+        x0, y0, x1, y1 = (int(round(v)) for v in box)
+        x0, y0 = max(x0, 0), max(y0, 0)
+        x1, y1 = min(x1, self.width - 1), min(y1, self.height - 1)
+        if x0 > x1 or y0 > y1:
+            return self
+        self.buffer[y0:y1 + 1, x0:x1 + 1] = _to_rgba(fill)
+        self._mark(x0, y0, x1, y1)
+        return self
+
+    # ── 합성 ────────────────────────────────────────────────────────────────
+    def composite(self, image: Image.Image, inplace: bool = False) -> Image.Image:
+        """
+        그려진 영역만 image 위에 알파 합성하여 반환하고 버퍼를 비웁니다.
+        inplace=True 이고 image 가 이미 RGBA 면 사본 없이 image 에 직접 합성합니다.
+        """
+        if image.mode != "RGBA":
+            image = image.convert("RGBA")
+        elif not inplace:
+            image = image.copy()
+        if self.dirty is None:
+            _trim_buffer()
+            return image
+
+        x0, y0, x1, y1 = self.dirty
+        region = Image.fromarray(np.ascontiguousarray(self.buffer[y0:y1, x0:x1]), "RGBA")
+        image.alpha_composite(region, dest=(x0, y0))
+
+        self.buffer[y0:y1, x0:x1] = 0
+        self.dirty = None
+        _local.dirty = None
+        _trim_buffer()
+        return image
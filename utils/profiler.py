@@ -0,0 +1,212 @@
+# utils/profiler.py
+#
+# 운영 요청 샘플링 프로파일러.
+# /analyze 요청 중 일부(PROFILE_SAMPLE_RATE) 또는 디버그 헤더가 붙은 요청만 cProfile 로
+# 실행하고, 결과를 시간 창(PROFILE_WINDOW_SEC) 단위로 합산해 pstats / collapsed-stack
+# (flamegraph.pl, speedscope 입력) 형식으로 내려받을 수 있게 합니다.
+# 샘플링이 꺼져 있으면 요청마다 비교 한 번 외의 비용은 없습니다.
+
+import cProfile
+import hmac
+import marshal
+import os
+import pstats
+import random
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from logger import logger
+
+# 프로파일링할 요청 비율 (0.0 ~ 1.0, 0 이면 샘플링 안 함)
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+
+# 프로파일 합산 시간 창 (초)
+PROFILE_WINDOW_SEC = int(os.getenv("PROFILE_WINDOW_SEC", "600"))
+
+# 요청 헤더 PROFILE_HEADER 값이 이 토큰과 같으면 무조건 프로파일링 (빈 값이면 헤더 무시)
+# /profile 다운로드도 같은 헤더·토큰이 있어야 하며, 토큰이 없으면 /profile 은 비활성(404)
+PROFILE_HEADER = "X-Profile"
+PROFILE_HEADER_TOKEN = os.getenv("PROFILE_HEADER_TOKEN", "")
+
+_current: ContextVar[Optional["ProfileSession"]] = ContextVar("profile_session", default=None)
+
+def has_profile_token(header_value: Optional[str] = None) -> bool:
+    """헤더 값이 설정된 PROFILE_HEADER_TOKEN 과 같은지 (토큰 미설정이면 항상 False)."""
+    if not PROFILE_HEADER_TOKEN or not header_value:
+        return False
+    return hmac.compare_digest(header_value.encode(), PROFILE_HEADER_TOKEN.encode())
+
+def should_profile(header_value: Optional[str] = None) -> bool:
+    if has_profile_token(header_value):
+        return True
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+def current_session() -> Optional["ProfileSession"]:
+    return _current.get()
+
+class ProfileSession:
+    """
+    요청 하나의 프로파일 묶음.
+    요청 스레드와, 스테이지 스레드 풀에서 실행된 스테이지(run)의 프로파일을 모읍니다.
+    """
+
+    def __init__(self):
+        self.owner = threading.get_ident()
+        self.profiles = []
+        self._lock = threading.Lock()
+
+    def run(self, fn, *args):
+        # 요청 스레드는 이미 프로파일 중이므로 중첩하지 않음 (cProfile 은 스레드당 하나)
+        if threading.get_ident() == self.owner:
+            return fn(*args)
+
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            return fn(*args)
+        finally:
+            profile.disable()
+            with self._lock:
+                self.profiles.append(profile)
+
+    def stats(self) -> Optional[pstats.Stats]:
+        with self._lock:
+            profiles = list(self.profiles)
+        if not profiles:
+            return None
+        return pstats.Stats(*profiles)
+
+@contextmanager
+def profiling(enabled: bool):
+    """
+    enabled 이면 블록을 cProfile 로 실행하고 ProfileSession 을 넘겨 줍니다.
+    끝난 뒤 session.stats() 로 요청 전체(스테이지 포함) 통계를 얻습니다.
+    """
+    if not enabled:
+        yield None
+        return
+
+    session = ProfileSession()
+    token = _current.set(session)
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield session
+    finally:
+        profile.disable()
+        _current.reset(token)
+        with session._lock:
+            session.profiles.append(profile)
+
+def _stats_from_dict(raw: dict) -> pstats.Stats:
+    stats = pstats.Stats()
+    stats.stats = raw
+    stats.get_top_level_stats()
+    return stats
+
+def _label(func) -> str:
+    filename, line, name = func
+    if filename == "~":
+        return name  # 내장 함수
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+class ProfileWindow:
+    """
+    샘플링된 요청의 프로파일을 시간 창 단위로 합산합니다.
+    창이 지나면 새 창을 시작하며, 내보내기는 현재 창(비어 있으면 직전 창) 기준입니다.
+    """
+
+    def __init__(self, window_sec: int = PROFILE_WINDOW_SEC):
+        self.window_sec = window_sec
+        self._lock = threading.Lock()
+        self._current = pstats.Stats()
+        self._previous = None
+        self._started = time.time()
+        self._samples = 0
+        self._previous_samples = 0
+
+    def _rotate(self):
+        if time.time() - self._started >= self.window_sec:
+            self._previous, self._previous_samples = self._current, self._samples
+            self._current, self._samples = pstats.Stats(), 0
+            self._started = time.time()
+
+    def add(self, stats):
+        """stats: pstats.Stats 또는 워커에서 넘어온 Stats.stats dict"""
+        if stats is None:
+            return
+        if isinstance(stats, dict):
+            stats = _stats_from_dict(stats)
+        with self._lock:
+            self._rotate()
+            self._current.add(stats)
+            self._samples += 1
+        logger.debug(f"[profile] 샘플 {self._samples}건 합산")
+
+    def _export_stats(self) -> tuple[pstats.Stats, int]:
+        with self._lock:
+            self._rotate()
+            if self._samples or self._previous is None:
+                return self._current, self._samples
+            return self._previous, self._previous_samples
+
+    def info(self) -> dict:
+        with self._lock:
+            return {
+                "window_sec": self.window_sec,
+                "window_started": self._started,
+                "samples": self._samples,
+                "previous_samples": self._previous_samples,
+                "sample_rate": PROFILE_SAMPLE_RATE,
+            }
+
+    def export_pstats(self) -> bytes:
+        """pstats.Stats(파일) 로 다시 읽을 수 있는 marshal 형식 (dump_stats 와 동일)."""
+        stats, _ = self._export_stats()
+        with self._lock:
+            return marshal.dumps(stats.stats)
+
+    def export_collapsed(self, max_depth: int = 64, min_seconds: float = 1e-5) -> str:
+        """
+        collapsed-stack 형식 ("a;b;c 마이크로초") 으로 내보냅니다.
+        cProfile 은 호출자-피호출자 간선만 기록하므로, 각 함수의 자체 시간을
+        호출 경로별 누적 시간 비율로 나눠 스택을 근사합니다.
+        경로당 누적 시간이 min_seconds 보다 작은 가지는 생략합니다.
+        """
+        stats, _ = self._export_stats()
+        with self._lock:
+            raw = dict(stats.stats)
+
+        children = defaultdict(list)
+        for func, (_, _, _, _, callers) in raw.items():
+            for caller, edge in callers.items():
+                children[caller].append((func, edge[3]))
+
+        lines = defaultdict(float)
+
+        def walk(func, stack, fraction):
+            _, _, tt, ct, _ = raw[func]
+            stack = stack + [_label(func)]
+            if tt * fraction > 0:
+                lines[";".join(stack)] += tt * fraction
+            if len(stack) >= max_depth:
+                return
+            for child, edge_ct in children.get(func, ()):
+                child_ct = raw[child][3]
+                child_fraction = fraction * edge_ct / child_ct if child_ct else 0
+                if child_fraction * child_ct >= min_seconds and _label(child) not in stack:
+                    walk(child, stack, min(child_fraction, 1.0))
+
+        roots = [func for func, value in raw.items() if not value[4]]
+        for root in roots:
+            walk(root, [], 1.0)
+
+        return "\n".join(f"{stack} {int(seconds * 1e6)}" for stack, seconds in lines.items()
+                         if seconds * 1e6 >= 1) + "\n"
+
+# 프로세스 전역 프로파일 창
+profile_window = ProfileWindow()
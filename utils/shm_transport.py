@@ -0,0 +1,222 @@
+# utils/shm_transport.py
+#
+# 요청 프로세스 ↔ 분석 워커 프로세스 간 공유 메모리 전송 계층.
+#
+# 요청 프로세스(소유자)가 고정 크기 슬롯 여러 개로 나뉜 SharedMemory 링을 만들고,
+# 슬롯 할당/반납도 소유자만 합니다. 워커에는 작은 디스크립터(ShmSlot, ShmArray)만
+# 큐로 넘어가고, 워커는 같은 메모리를 NumPy 뷰로 붙여 복사 없이 읽고 씁니다.
+#
+# 정리 규칙
+# - 소유자: close() / 프로세스 종료(atexit) 시 unlink. 소유자가 비정상 종료해도
+#   multiprocessing resource_tracker 가 세그먼트를 회수합니다.
+# - 세그먼트는 생성 시 posix_fallocate 로 실제 페이지를 확보합니다. /dev/shm 이 모자라면
+#   생성 단계에서 OSError 가 나고(피클 전송으로 대체), 나중에 쓰다가 SIGBUS 로 죽지 않습니다.
+# - 워커: 붙인 세그먼트를 프로세스 수명 동안 캐시하고 unlink 하지 않습니다.
+#   워커는 소유자가 multiprocessing 으로 띄운 프로세스여야 합니다 (resource_tracker 공유).
+#   워커가 죽더라도 슬롯은 소유자가 작업 실패 후 반납합니다.
+
+import atexit
+import os
+import queue
+import threading
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+from typing import Dict, NamedTuple, Optional, Tuple
+
+import numpy as np
+from logger import logger
+
+# 슬롯 하나의 크기(바이트)
+SHM_SLOT_BYTES = int(os.getenv("SHM_SLOT_BYTES", str(8 * 1024 * 1024)))
+
+# 링이 차지할 수 있는 /dev/shm 여유 공간 비율
+SHM_MAX_FREE_FRACTION = 0.5
+SHM_DIR = "/dev/shm"
+
+# 프로세스별 세그먼트 연결 캐시 (이름 → SharedMemory)
+_attached: Dict[str, shared_memory.SharedMemory] = {}
+_attached_lock = threading.Lock()
+
+class ShmSlot(NamedTuple):
+    """링 안의 슬롯 하나를 가리키는 디스크립터."""
+    shm_name: str
+    index: int
+    offset: int
+    capacity: int
+
+class ShmArray(NamedTuple):
+    """슬롯에 기록된 배열의 디스크립터 (shape, dtype 포함)."""
+    slot: ShmSlot
+    shape: Tuple[int, ...]
+    dtype: str
+
+    @property
+    def nbytes(self) -> int:
+        return int(np.prod(self.shape, dtype=np.int64)) * np.dtype(self.dtype).itemsize
+
+class ShmRing:
+    """
+    소유자(요청 프로세스) 쪽 공유 메모리 슬롯 링.
+
+    사용 예:
+        ring = ShmRing(slot_count=8)
+        slot = ring.acquire()
+        desc = write_array(slot, frame)      # 워커로는 desc 만 전달
+        ...
+        ring.release(slot)
+        ring.close()
+    """
+
+    def __init__(self, slot_count: int, slot_bytes: int = SHM_SLOT_BYTES):
+        self.slot_count = slot_count
+        self.slot_bytes = slot_bytes
+        self.shm = shared_memory.SharedMemory(create=True, size=slot_count * slot_bytes)
+        try:
+            _reserve(self.shm, slot_count * slot_bytes)
+        except OSError:
+            self.shm.close()
+            self.shm.unlink()
+            raise
+        # 최근 반납한 슬롯부터 재사용 (LIFO): 자주 쓰는 슬롯만 캐시에 남음
+        self._free: "queue.LifoQueue[int]" = queue.LifoQueue()
+        for index in reversed(range(slot_count)):
+            self._free.put(index)
+        self._closed = False
+        self._lock = threading.Lock()
+        # 소유자 프로세스 안에서의 attach_view 는 같은 매핑을 재사용
+        _attached[self.shm.name] = self.shm
+        atexit.register(self.close)
+        logger.info(f"공유 메모리 링 생성: {self.shm.name} ({slot_count} x {slot_bytes // 1024}KB)")
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def acquire(self, timeout: Optional[float] = None) -> Optional[ShmSlot]:
+        """빈 슬롯을 꺼냅니다. timeout=None 이면 기다리지 않고, 빈 슬롯이 없으면 None."""
+        try:
+            if timeout is None:
+                index = self._free.get_nowait()
+            else:
+                index = self._free.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        return ShmSlot(self.shm.name, index, index * self.slot_bytes, self.slot_bytes)
+
+    def acquire_pair(self, nbytes: int) -> Tuple[Optional[ShmSlot], Optional[ShmSlot]]:
+        """
+        입력(nbytes 바이트)·출력 슬롯 한 쌍을 꺼냅니다.
+        빈 슬롯이 모자라거나 입력이 슬롯보다 크면 (None, None) → 피클 전송.
+        """
+        in_slot = self.acquire()
+        out_slot = self.acquire() if fits(in_slot, nbytes) else None
+        if out_slot is None:
+            self.release(in_slot)
+            return None, None
+        return in_slot, out_slot
+
+    def release(self, slot: Optional[ShmSlot]):
+        if slot is not None and slot.shm_name == self.shm.name:
+            self._free.put(slot.index)
+
+    def release_when_done(self, future: Optional[Future], *slots: Optional[ShmSlot]):
+        """
+        future 가 끝난 뒤(성공·예외·취소·워커 비정상 종료 모두) slots 를 반납합니다.
+        워커가 아직 슬롯에 쓰는 중일 수 있으므로 요청이 먼저 끝나도 바로 반납하지 않습니다.
+        future 가 None 이면(제출 실패) 즉시 반납합니다.
+        """
+        def release(_=None):
+            for slot in slots:
+                self.release(slot)
+
+        if future is None or future.done():
+            release()
+        else:
+            future.add_done_callback(release)
+
+    def free_count(self) -> int:
+        return self._free.qsize()
+
+    def view(self, desc: ShmArray) -> np.ndarray:
+        """소유자 쪽에서 디스크립터가 가리키는 배열 뷰를 꺼냅니다 (복사 없음)."""
+        return _array_view(self.shm, desc)
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        _attached.pop(self.shm.name, None)
+        try:
+            self.shm.close()
+        except BufferError:
+            # 아직 살아 있는 뷰가 있으면 매핑은 GC 에 맡기고 이름만 제거
+            logger.warning(f"공유 메모리 뷰가 남아 있어 매핑 해제를 건너뜀: {self.shm.name}")
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+        logger.info(f"공유 메모리 링 정리 완료: {self.shm.name}")
+
+def _reserve(shm: shared_memory.SharedMemory, size: int):
+    # SharedMemory(create=True) 는 ftruncate 만 하므로 tmpfs 용량을 넘어도 생성은 성공하고
+    # 나중에 넘는 페이지를 처음 쓸 때 SIGBUS 가 납니다. 미리 할당해 생성 시점에 실패시킴
+    fd = getattr(shm, "_fd", -1)
+    if hasattr(os, "posix_fallocate") and fd >= 0:
+        os.posix_fallocate(fd, 0, size)
+
+def shm_free_bytes() -> Optional[int]:
+    """/dev/shm 여유 공간(바이트). 알 수 없는 플랫폼이면 None."""
+    try:
+        stat = os.statvfs(SHM_DIR)
+    except (AttributeError, OSError):
+        return None
+    return stat.f_bavail * stat.f_frsize
+
+def fit_slot_count(slot_count: int, slot_bytes: int = SHM_SLOT_BYTES) -> int:
+    """slot_count 를 /dev/shm 여유 공간의 SHM_MAX_FREE_FRACTION 안에 들어가도록 줄입니다."""
+    free = shm_free_bytes()
+    if free is None:
+        return slot_count
+    fitted = min(slot_count, int(free * SHM_MAX_FREE_FRACTION) // slot_bytes)
+    if fitted < slot_count:
+        logger.warning(f"/dev/shm 여유 공간({free // (1024 * 1024)}MB) 부족: "
+                       f"공유 메모리 슬롯 {slot_count}개 → {fitted}개")
+    return max(fitted, 0)
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 공통: 디스크립터 → NumPy 뷰
+def _attach(shm_name: str) -> shared_memory.SharedMemory:
+    # multiprocessing 으로 띄운 워커는 소유자와 resource_tracker 를 공유하므로
+    # 연결만 해도 추적 대상이 늘지 않고, 워커 종료 시 세그먼트가 지워지지 않음
+    shm = _attached.get(shm_name)
+    if shm is None:
+        with _attached_lock:
+            shm = _attached.get(shm_name)
+            if shm is None:
+                shm = shared_memory.SharedMemory(name=shm_name)
+                _attached[shm_name] = shm
+    return shm
+
+def _array_view(shm: shared_memory.SharedMemory, desc: ShmArray) -> np.ndarray:
+    if desc.nbytes > desc.slot.capacity:
+        raise ValueError(f"Array of {desc.nbytes} bytes exceeds slot capacity {desc.slot.capacity}")
+    return np.ndarray(desc.shape, dtype=np.dtype(desc.dtype), buffer=shm.buf, offset=desc.slot.offset)
+
+def attach_view(desc: ShmArray) -> np.ndarray:
+    """디스크립터가 가리키는 배열을 현재 프로세스에서 NumPy 뷰로 엽니다 (복사 없음)."""
+    return _array_view(_attach(desc.slot.shm_name), desc)
+
+def fits(slot: Optional[ShmSlot], nbytes: int) -> bool:
+    return slot is not None and nbytes <= slot.capacity
+
+def write_array(slot: ShmSlot, array: np.ndarray) -> ShmArray:
+    """array 를 slot 에 한 번 복사해 넣고 디스크립터를 반환합니다."""
+    array = np.asarray(array)
+    desc = ShmArray(slot, tuple(array.shape), array.dtype.str)
+    view = attach_view(desc)
+    view[...] = array
+    return desc
+
+def write_bytes(slot: ShmSlot, data: bytes) -> ShmArray:
+    return write_array(slot, np.frombuffer(data, dtype=np.uint8))
@@ -0,0 +1,148 @@
+# utils/stage_scheduler.py
+
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from logger import logger
+from utils.profiler import current_session
+
+# 모든 요청이 공유하는 스테이지 스레드 풀 크기
+STAGE_POOL_SIZE = int(os.getenv("STAGE_POOL_SIZE", str(os.cpu_count() or 4)))
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+def set_stage_pool_size(size: int):
+    """
+    스테이지 스레드 풀 크기를 바꿉니다 (워커 프로세스 초기화용).
+    이미 만들어진 풀이 있으면 닫고, 다음 get_stage_executor() 에서 새 크기로 만듭니다.
+    """
+    global STAGE_POOL_SIZE, _executor
+    with _executor_lock:
+        STAGE_POOL_SIZE = max(int(size), 1)
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+            _executor = None
+
+def get_stage_executor() -> ThreadPoolExecutor:
+    """요청 간에 공유하는 스테이지 스레드 풀을 (최초 호출 시 생성하여) 반환합니다."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=STAGE_POOL_SIZE, thread_name_prefix="stage")
+    return _executor
+
+class Stage(NamedTuple):
+    name: str
+    fn: Callable[..., Any]
+    deps: Tuple[str, ...]
+
+class StageScheduler:
+    """
+    요청 하나의 스테이지들을 의존성 그래프로 실행하는 스케줄러.
+
+    각 스테이지 함수는 deps 스테이지들의 결과를 순서대로 인자로 받습니다.
+    준비된 스테이지는 공유 스레드 풀에서 최대 max_parallel 개까지 동시에 실행되며,
+    max_parallel <= 1 이면 호출한 스레드에서 등록 순서대로 실행합니다.
+
+    사용 예:
+        scheduler = StageScheduler(max_parallel=4)
+        scheduler.add("a", load)
+        scheduler.add("b", process, deps=("a",))
+        results = scheduler.run()
+    """
+
+    def __init__(self, max_parallel: int = 1, executor: Optional[ThreadPoolExecutor] = None):
+        self.max_parallel = max(int(max_parallel), 1)
+        self.executor = executor
+        self.stages: Dict[str, Stage] = {}
+        self.results: Dict[str, Any] = {}
+        self.timings: Dict[str, Tuple[float, float]] = {}
+        self.profile_session = None
+
+    def add(self, name: str, fn: Callable[..., Any], deps: Sequence[str] = ()) -> str:
+        if name in self.stages:
+            raise ValueError(f"Duplicate stage: {name}")
+        for dep in deps:
+            if dep not in self.stages:
+                raise ValueError(f"Unknown dependency '{dep}' for stage '{name}'")
+        self.stages[name] = Stage(name, fn, tuple(deps))
+        return name
+
+    def _call(self, stage: Stage):
+        args = [self.results[dep] for dep in stage.deps]
+        start = time.perf_counter()
+        try:
+            # 프로파일링 중인 요청이면 스테이지 스레드에서도 프로파일 수집
+            if self.profile_session is not None:
+                return self.profile_session.run(stage.fn, *args)
+            return stage.fn(*args)
+        finally:
+            self.timings[stage.name] = (start, time.perf_counter())
+
+    def run(self) -> Dict[str, Any]:
+        self._started = time.perf_counter()
+        self.profile_session = current_session()
+
+        # 의존성은 등록 시점에 이미 존재해야 하므로 등록 순서가 곧 위상 정렬 순서
+        if self.max_parallel <= 1:
+            for stage in self.stages.values():
+                self.results[stage.name] = self._call(stage)
+            self._finished = time.perf_counter()
+            return self.results
+
+        executor = self.executor or get_stage_executor()
+        pending = list(self.stages.values())
+        running = {}
+        try:
+            while pending or running:
+                for stage in list(pending):
+                    if len(running) >= self.max_parallel:
+                        break
+                    if all(dep in self.results for dep in stage.deps):
+                        pending.remove(stage)
+                        running[executor.submit(self._call, stage)] = stage.name
+                if not running:
+                    raise RuntimeError("No runnable stage: " + ", ".join(s.name for s in pending))
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    self.results[name] = future.result()
+        finally:
+            # 예외 시 아직 시작하지 않은 스테이지는 취소
+            for future in running:
+                future.cancel()
+
+        self._finished = time.perf_counter()
+        return self.results
+
+    def critical_path(self) -> List[Tuple[str, float]]:
+        """
+        가장 늦게 끝난 스테이지에서부터, 가장 늦게 끝난 선행 스테이지를 따라가며
+        요청 지연을 결정한 경로를 [(스테이지, 소요 ms), ...] 로 반환합니다.
+        """
+        if not self.timings:
+            return []
+        name = max(self.timings, key=lambda n: self.timings[n][1])
+        path = []
+        while name is not None:
+            start, end = self.timings[name]
+            path.append((name, (end - start) * 1000))
+            deps = [d for d in self.stages[name].deps if d in self.timings]
+            name = max(deps, key=lambda d: self.timings[d][1]) if deps else None
+        return list(reversed(path))
+
+    def log_timings(self, tag: str):
+        wall_ms = (self._finished - self._started) * 1000
+        busy_ms = sum(end - start for start, end in self.timings.values()) * 1000
+        path = " → ".join(f"{name}({ms:.1f}ms)" for name, ms in self.critical_path())
+        logger.info(f"[{tag}] 스테이지 {len(self.timings)}개, 병렬도 {self.max_parallel}, "
+                    f"벽시계 {wall_ms:.1f}ms / 누적 {busy_ms:.1f}ms, 임계 경로: {path}")
+        for name, (start, end) in sorted(self.timings.items(), key=lambda item: item[1][0]):
+            logger.debug(f"[{tag}] {name}: +{(start - self._started) * 1000:.1f}ms "
+                         f"~ +{(end - self._started) * 1000:.1f}ms")
@@ -1,5 +1,6 @@
-from PIL import Image, ImageDraw
-from typing import List, Tuple
+from PIL import Image
+from typing import Iterable, List, Optional, Tuple
+from utils.overlay_utils import OverlayRenderer
 
 def draw_landmark_points(
     image: Image.Image,
@@ -19,18 +20,9 @@ def draw_landmark_points(
     Returns:
         랜드마크가 오버레이된 새로운 PIL Image 객체
     """
-    if image.mode != "RGBA":
-        image = image.convert("RGBA")
-
-    overlay = Image.new("RGBA", image.size, (0, 0, 0, 0))
-    draw = ImageDraw.Draw(overlay)
-
-    for x, y in landmarks:
-        left_up = (x - radius, y - radius)
-        right_down = (x + radius, y + radius)
-        draw.ellipse([left_up, right_down], fill=color)
-
-    return Image.alpha_composite(image, overlay)
+    renderer = OverlayRenderer(image.size)
+    renderer.points(landmarks, color=color, radius=radius)
+    return renderer.composite(image)
 
 def draw_specific_points(
     image: Image.Image,
@@ -52,17 +44,34 @@ def draw_specific_points(
     Returns:
         강조된 랜드마크 오버레이된 PIL Image 객체
     """
-    if image.mode != "RGBA":
-        image = image.convert("RGBA")
+    renderer = OverlayRenderer(image.size)
+    renderer.points([landmarks[idx] for idx in indices if idx < len(landmarks)], color=color, radius=radius)
+    return renderer.composite(image)
+
+def draw_landmark_mesh(
+    image: Image.Image,
+    landmarks: List[Tuple[float, float]],
+    connections: Optional[Iterable[Tuple[int, int]]] = None,
+    color: str = "white",
+    width: int = 1
+) -> Image.Image:
+    """
+    랜드마크를 잇는 메쉬(기본: FaceMesh 테셀레이션)를 그려 반환합니다.
 
-    overlay = Image.new("RGBA", image.size, (0, 0, 0, 0))
-    draw = ImageDraw.Draw(overlay)
+    Args:
+        image: PIL Image 객체
+        landmarks: [(x, y), ...] 형태의 랜드마크 좌표 리스트
+        connections: (i, j) 인덱스 쌍 목록 (기본값 FACEMESH_TESSELATION)
+        color: 선 색상 (기본 'white')
+        width: 선 두께(px) (기본값 1)
 
-    for idx in indices:
-        if idx < len(landmarks):
-            x, y = landmarks[idx]
-            left_up = (x - radius, y - radius)
-            right_down = (x + radius, y + radius)
-            draw.ellipse([left_up, right_down], fill=color)
+    Returns:
+        메쉬가 오버레이된 PIL Image 객체
+    """
+    if connections is None:
+        from mediapipe.python.solutions.face_mesh_connections import FACEMESH_TESSELATION
+        connections = FACEMESH_TESSELATION
 
-    return Image.alpha_composite(image, overlay)
+    renderer = OverlayRenderer(image.size)
+    renderer.mesh(landmarks, connections, color=color, width=width)
+    return renderer.composite(image)